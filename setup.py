@@ -21,10 +21,18 @@ setup(
     package_dir={"": "src"},  
     packages=find_packages(where="src"),  
     python_requires=">=3.7", 
+    entry_points={
+        "console_scripts": [
+            "uddr=uddr_client.cli:main",
+        ],
+    },
     install_requires=[
         "pandas>=2.0.2",
         "xmltodict>=0.13.0",
         "python-decouple>=3.8",
         "requests>=2.25.1",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+    },
 )
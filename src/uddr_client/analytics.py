@@ -0,0 +1,238 @@
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Union
+from .response import Response, concat_frames
+
+# Log fields that aggregates() can group on, mapped to the log record column holding them.
+# Override with the columns argument if your export names them differently.
+DEFAULT_COLUMNS = {
+    'DOMAIN': 'domain_2tld',
+    'FQDN': 'domain',
+    'TLD': 'domain_tld',
+    'COUNTRY': 'country',
+    'REGISTRAR': 'registrar',
+}
+
+# Columns that repeat heavily and are stored as categoricals
+CATEGORICAL_COLUMNS = {'domain', 'domain_2tld', 'domain_tld', 'country', 'registrar', 'query_type',
+                       'response_code', 'nameserver', 'nameserver_2tld', 'nameserver_tld', 'reputation'}
+
+
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+class LogAnalytics:
+    """
+    Compute overview statistics locally from log records already fetched with logs().
+
+    Records are ingested page by page into typed columns (categoricals for repetitive strings,
+    datetime64 for timestamps) and every statistic is a vectorized pandas group-by. The results
+    are Response objects shaped like the server's aggregates, histogram and bar responses, so
+    exploring different parameters costs no API calls.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, str]] = None, datetime_column: str = 'datetime',
+                 blocked_column: str = 'blocked'):
+        """
+        :param columns: (Optional) Overrides for DEFAULT_COLUMNS, e.g. {'COUNTRY': 'geo_country'}.
+        :param datetime_column: The record field holding the query timestamp.
+        :param blocked_column: The record field holding whether the query was blocked.
+        """
+        self.columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+        self.datetime_column = datetime_column
+        self.blocked_column = blocked_column
+        self._chunks = []
+        self._frame = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'LogAnalytics':
+        """Load a columnar (.parquet), .csv or NDJSON (.ndjson/.jsonl) log export"""
+        analytics = cls(**kwargs)
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path)
+        elif path.endswith(('.ndjson', '.jsonl')):
+            df = pd.read_json(path, lines=True)
+        else:
+            df = pd.read_csv(path)
+        analytics.ingest(df)
+        return analytics
+
+    def ingest(self, page: Union[Response, dict, List[dict], pd.DataFrame]) -> 'LogAnalytics':
+        """
+        Add a page of log records.
+
+        :param page: A logs() Response, its raw data, a list of log records or a DataFrame.
+        """
+        if isinstance(page, Response):
+            page = page.raw()
+        if isinstance(page, dict):
+            page = page.get('logs', [])
+        df = page if isinstance(page, pd.DataFrame) else pd.json_normalize(page)
+        if len(df):
+            self._chunks.append(self._typed(df))
+            self._frame = None
+        return self
+
+    def ingest_all(self, pages: Iterable) -> 'LogAnalytics':
+        for page in pages:
+            self.ingest(page)
+        return self
+
+    def _typed(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for column in df.columns:
+            if column == self.datetime_column:
+                df[column] = pd.to_datetime(df[column], utc=True, errors='coerce')
+            elif column == self.blocked_column:
+                df[column] = df[column].astype('boolean')
+            elif column in CATEGORICAL_COLUMNS or column in self.columns.values():
+                df[column] = df[column].astype('category')
+        return df
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """All ingested records as one DataFrame, built on first use after an ingest"""
+        if self._frame is None:
+            if not self._chunks:
+                self._frame = pd.DataFrame()
+            elif len(self._chunks) == 1:
+                self._frame = self._chunks[0]
+            else:
+                self._frame = concat_frames(self._chunks)
+                self._chunks = [self._frame]
+        return self._frame
+
+    def _column(self, query_type: str) -> pd.Series:
+        if query_type.upper() not in self.columns:
+            raise ValueError("aggregates: query_type must be one of %r" % set(self.columns))
+        df = self.frame
+        column = self.columns[query_type.upper()]
+        if column in df:
+            return df[column]
+
+        # Derive DOMAIN and TLD from the FQDN when the export doesn't carry them.
+        # The label split runs once per distinct name, not once per row.
+        fqdn = self.columns['FQDN']
+        if fqdn in df and query_type.upper() in ('DOMAIN', 'TLD'):
+            labels = 2 if query_type.upper() == 'DOMAIN' else 1
+            names = df[fqdn].astype('category')
+            categories = names.cat.categories.to_series()
+            derived = categories.str.rstrip('.').str.split('.').str[-labels:].str.join('.')
+            return names.map(dict(zip(categories, derived))).astype('category')
+        raise ValueError(f"The logs have no '{column}' column for query_type {query_type}")
+
+    def _window(self, start: Optional[str], end: Optional[str]) -> pd.Series:
+        times = self.frame[self.datetime_column]
+        mask = pd.Series(True, index=self.frame.index)
+        if start is not None:
+            mask &= times >= _utc(start)
+        if end is not None:
+            mask &= times < _utc(end)
+        return mask
+
+    def top(self, query_type: str, top_count: int = 25, start: Optional[str] = None,
+            end: Optional[str] = None) -> pd.Series:
+        """The top_count most frequent values of a field, as a Series of counts"""
+        values = self._column(query_type)
+        if start is not None or end is not None:
+            values = values[self._window(start, end)]
+        counts = values.value_counts(sort=True)
+        # Categoricals also count categories that don't occur in the window
+        return counts[counts > 0].head(top_count)
+
+    def aggregates(self, query_type: str, top_count: int = 25, start: Optional[str] = None,
+                   end: Optional[str] = None) -> Response:
+        """
+        Local equivalent of APIClient.aggregates.
+
+        :param query_type: DOMAIN, FQDN, COUNTRY, TLD or REGISTRAR.
+        :param top_count: How many aggregate values to return. The default is 25.
+        :param start: (Optional) Only count records at or after this time. With end, the equally
+                      long window just before start is counted as previous_doc_count.
+        :param end: (Optional) Only count records before this time.
+        :return: A Response shaped like the aggregates endpoint's.
+        """
+        current = self.top(query_type, top_count, start, end)
+        previous = None
+        if start is not None and end is not None:
+            span = _utc(end) - _utc(start)
+            prev_start = _utc(start) - span
+            values = self._column(query_type)[self._window(prev_start, start)]
+            previous = values.value_counts()
+
+        top_items = [{
+            'current_doc_count': int(count),
+            'key': key,
+            'previous_doc_count': int(previous.get(key, 0)) if previous is not None else 0,
+        } for key, count in current.items()]
+        return Response({'query_type': query_type.upper(), 'top_items': top_items})
+
+    def _counts(self, blocked_only: bool, interval: str) -> pd.Series:
+        df = self.frame
+        times = df[self.datetime_column]
+        if blocked_only:
+            times = times[df[self.blocked_column].fillna(False).astype(bool)]
+        return times.dt.floor(interval).value_counts().sort_index()
+
+    def histogram(self, query_type: str = 'QUERIES', interval: str = '30min',
+                  previous: Optional[str] = None) -> Response:
+        """
+        Local equivalent of APIClient.histogram.
+
+        :param query_type: QUERIES or BLOCKED_QUERIES.
+        :param interval: The bucket width as a pandas offset alias, e.g. '30min' or '1h'.
+        :param previous: (Optional) An offset such as '7D'; previous_doc_count is the count of the
+                         bucket that far back. The default leaves previous_doc_count at 0.
+        :return: A Response shaped like the histogram endpoint's.
+        """
+        VALID_QUERY_TYPE = {'QUERIES', 'BLOCKED_QUERIES'}
+        if query_type.upper() not in VALID_QUERY_TYPE:
+            raise ValueError("histogram: query_type must be one of %r" % VALID_QUERY_TYPE)
+
+        counts = self._counts(query_type.upper() == 'BLOCKED_QUERIES', interval)
+        return Response({'query_type': query_type.lower(), 'top_items': self._items(counts, previous)})
+
+    def bar(self, interval: str = '1D', previous: str = '7D') -> Response:
+        """
+        Local equivalent of APIClient.bar('BLOCK_QUERIES'): blocked queries per bucket
+        compared with the bucket `previous` earlier.
+        """
+        counts = self._counts(True, interval)
+        return Response({'query_type': 'block_queries', 'top_items': self._items(counts, previous, with_key=True)})
+
+    @staticmethod
+    def _items(counts: pd.Series, previous: Optional[str], with_key: bool = False) -> List[dict]:
+        fmt = '%Y-%m-%d %H:%M:%S'
+        items = []
+        offset = pd.Timedelta(previous) if previous is not None else None
+        for key, count in counts.items():
+            item = {'current_doc_count': int(count), 'key': key.strftime(fmt), 'previous_doc_count': 0}
+            if offset is not None:
+                item['previous_doc_count'] = int(counts.get(key - offset, 0))
+                if with_key:
+                    item['previous_key'] = (key - offset).strftime(fmt)
+            items.append(item)
+        return items
+
+    def blocked_ratio(self, by: Optional[str] = None, interval: Optional[str] = None) -> Union[float, pd.Series]:
+        """
+        The fraction of queries that were blocked.
+
+        :param by: (Optional) A query_type (DOMAIN, FQDN, ...) to compute the ratio per value.
+        :param interval: (Optional) A bucket width to compute the ratio over time.
+        :return: A float, or a Series indexed by value or time bucket.
+        """
+        df = self.frame
+        blocked = df[self.blocked_column].fillna(False).astype(bool)
+        if by is None and interval is None:
+            return float(blocked.mean()) if len(blocked) else 0.0
+        keys = []
+        if by is not None:
+            keys.append(self._column(by))
+        if interval is not None:
+            keys.append(df[self.datetime_column].dt.floor(interval))
+        return blocked.groupby(keys, observed=True).mean()
@@ -1 +1,2 @@
-from .api_client import APIClient
\ No newline at end of file
+from .api_client import APIClient
+from .query import LogQuery, PassthroughQuery, Filter
\ No newline at end of file
@@ -1,9 +1,12 @@
-import json, datetime, re
-from typing import Dict, List, Optional
+import json, re
+from typing import Dict, List, Optional, Union
 from ..response import Response
 from ..connection import Connection
 from .account import Account
 from .decision import Decision
+from .snapshot import Snapshot, fetch_snapshot
+from .report_downloader import ReportDownloader, DownloadResult
+from .query import LogQuery, PassthroughQuery, is_valid_date
 
 class APIClient:
     def __init__(self, connection: Connection):
@@ -16,14 +19,7 @@ class APIClient:
         :param date: The string to validate.
         :return: A boolean value. True if the string is a valid date, False otherwise.
         """
-        formats = ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d")
-        for date_format in formats:
-            try:
-                datetime.datetime.strptime(date, date_format)
-                return True
-            except ValueError:
-                continue
-        return False
+        return is_valid_date(date)
         
     # Overview
 
@@ -190,6 +186,22 @@ class APIClient:
 
         response = self.connection.post(uri, json.dumps({'applied_filters': applied_filters}))
         return Response(response)
+
+    def snapshot(self, max_workers: int = 14, **kwargs) -> Snapshot:
+        """
+        Fetch every overview panel concurrently.
+
+        This method calls summary (TOTAL, BLOCKED, INDICATORS), bar (4 query types), 
+        histogram (2 query types) and aggregates (5 query types) in parallel over the 
+        connection's pooled session, instead of 14 sequential round trips.
+        A failing panel does not fail the snapshot; its error is recorded on the panel.
+
+        :param max_workers: The number of concurrent requests. The default is 14 (one per panel).
+        :param kwargs: Additional parameters passed to aggregates(), e.g. 'top_count'.
+        :return: A Snapshot. Use snapshot.get('bar', 'BLOCK_QUERIES') to get a panel's Response,
+                 snapshot.status() for per-panel status and snapshot.raw() for the nested data.
+        """
+        return fetch_snapshot(self, max_workers=max_workers, **kwargs)
         
     # Reports
         
@@ -251,6 +263,24 @@ class APIClient:
         response = self.connection.post(uri, json.dumps(data))
         return Response(response)
 
+    def download_reports(self, directory: str, datetime_start: Optional[str] = None,
+                         datetime_end: Optional[str] = None, **kwargs) -> List[DownloadResult]:
+        """
+        Download every executive report in a date window to a directory.
+
+        The PDFs are streamed to disk in chunks, several at a time. Reports already on disk 
+        (matched by report_id and size) are skipped and interrupted downloads are resumed.
+
+        :param directory: The directory to write <report_id>.pdf files to.
+        :param datetime_start: The start date for the reports in the format 'YYYY-MM-DDTHH:MM:SS.sssZ'
+        :param datetime_end: The end date for the reports in the format 'YYYY-MM-DDTHH:MM:SS.sssZ'
+        :param kwargs: Additional ReportDownloader parameters: max_workers, chunk_size and progress,
+                       a callable invoked as progress(DownloadProgress, DownloadResult) after each report.
+        :return: A list of DownloadResult objects.
+        """
+        reports = self.reports(datetime_start, datetime_end)
+        return ReportDownloader(self.connection, directory, **kwargs).download(reports)
+
     # Logs
 
     def histogram_artifact(self, artifact: str, artifact_type: str, start_date: str, end_date: str, interval: str, **kwargs) -> Response:
@@ -307,7 +337,7 @@ class APIClient:
         response = self.connection.post(uri, json.dumps({'applied_filters': applied_filters}))
         return Response(response)
 
-    def logs(self, applied_filters: List[Dict]) -> Response:
+    def logs(self, applied_filters: Union[List[Dict], LogQuery]) -> Response:
         """
         Query the logs endpoint.
 
@@ -342,35 +372,21 @@ class APIClient:
                 - "partial": (boolean) Flag to indicate if the filter should do partial matching.
                 - "rangeValue": (dictionary) If "isRange" is true, this dictionary with 'start' and 'end' keys represents the range value.
                 - "value": (string) If "isRange" is false, this represents the filter value.
+            A prebuilt LogQuery can be passed instead, to skip validating and serializing the filters again.
+            The filter dictionaries are not modified.
 
         :return: A logs response object.
         :raises ValueError: If 'id' is not a valid value or date format in 'rangeValue' is not 'YYYY-MM-DDTHH:MM:SS.sssZ'.
         """
-        uri = "/logs"
-
-        VALID_ID = {'DOMAIN', 'DOMAIN_2TLD', 'DOMAIN_TLD', 'DOMAIN_AGE', 'QUERY_TYPE', 'RESPONSE_CODE', 'TTL', 'NAMESERVER', 
-                    'NAMESERVER_2TLD', 'NAMESERVER_TLD', 'NAMESERVER_IP', 'A_RECORD', 'AAAA_RECORD', 'C_NAME', 
-                    'C_NAME_2TLD', 'C_NAME_TLD', 'REGISTRAR', 'REPUTATION', 'DATETIME'}
-
-        # Validate and convert parameters to proper format
-        for filter in applied_filters:
-            filter['id'] = filter['id'].upper()
-            if filter['id'] not in VALID_ID:
-                raise ValueError(f"Invalid filter ID. Must be one of {VALID_ID}")
-
-            if 'isRange' in filter and filter['isRange']:
-                # Check date format for 'start' and 'end'
-                for key in ('start', 'end'):
-                    if not self._is_valid_date(filter['rangeValue'][key]):
-                        raise ValueError(f"The '{key}' date in 'rangeValue' must be in 'YYYY-MM-DDTHH:MM:SS.sssZ' format.")
-            filter['id'] = filter['id'].lower()
+        if not isinstance(applied_filters, LogQuery):
+            applied_filters = LogQuery(applied_filters)
 
-        response = self.connection.post(uri, json.dumps({'applied_filters': applied_filters}))
+        response = self.connection.post(LogQuery.ENDPOINT, applied_filters.payload())
         return Response(response)
         
     # Passthrough
     
-    def passthrough(self, applied_filters: List[Dict]) -> Response:
+    def passthrough(self, applied_filters: Union[List[Dict], PassthroughQuery]) -> Response:
         """
         Query the passthrough endpoint.
 
@@ -388,29 +404,15 @@ class APIClient:
             - partial: If the filter should do partial matching (boolean).
             - rangeValue: Dictionary with 'start' and 'end' keys representing the range start and end values (string in YYYY-MM-DDTHH:MM:SS format).
             - value: The filter value (string).
+            A prebuilt PassthroughQuery can be passed instead, to skip validating and serializing the filters again.
             
         :return: A dictionary containing the passthrough data.
         :raises ValueError: If 'id' is not a valid value or date format in 'rangeValue' is not 'YYYY-MM-DDTHH:MM:SS.sssZ'.
         """
-        uri = "/passthrough"
-        
-        # validate that the filter ids are within the valid options
-        valid_ids = ['LAST_SEEN', 'ARTIFACT', 'HYAS_STATUS', 'ALT_STATUS', 'QUERY_COUNT']
-        for filter in applied_filters:
-            if filter['id'].upper() not in valid_ids:
-                raise ValueError(f"Invalid id in filter: {filter['id']}. Must be one of {valid_ids}")
-                
-            # if the filter is a range, validate the date strings
-            if filter['isRange']:
-                start = filter.get('rangeValue', {}).get('start')
-                end = filter.get('rangeValue', {}).get('end')
-                if start and not self._is_valid_date(start):
-                    raise ValueError(f"Invalid start date in filter: {start}. Dates should be in the format 'YYYY-MM-DDTHH:MM:SS'.")
-                if end and not self._is_valid_date(end):
-                    raise ValueError(f"Invalid end date in filter: {end}. Dates should be in the format 'YYYY-MM-DDTHH:MM:SS'.")
-                
-        # make the request
-        response = self.connection.post(uri, json.dumps({'applied_filters': applied_filters}))
+        if not isinstance(applied_filters, PassthroughQuery):
+            applied_filters = PassthroughQuery(applied_filters)
+
+        response = self.connection.post(PassthroughQuery.ENDPOINT, applied_filters.payload())
         return Response(response)
 
     # Private APIs
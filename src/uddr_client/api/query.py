@@ -0,0 +1,215 @@
+import copy, datetime, json
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Union
+
+DATE_FORMATS = ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d")
+
+
+@lru_cache(maxsize=4096)
+def is_valid_date(date: str) -> bool:
+    """
+    Validate if a string is in 'YYYY-MM-DDTHH:MM:SS.sssZ' or 'YYYY-MM-DD' format.
+
+    Results are cached, pollers tend to validate the same window bounds repeatedly.
+    """
+    if not isinstance(date, str):
+        return False
+    for date_format in DATE_FORMATS:
+        try:
+            datetime.datetime.strptime(date, date_format)
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+class Filter:
+    """
+    A single validated filter. Its JSON fragment is serialized once and cached.
+
+    A filter built from a caller's dictionary keeps that dictionary (raw) and is sent exactly as
+    given apart from the id casing the endpoint expects, like the endpoints did before queries
+    existed. Filters built from arguments are sent with every key.
+    """
+    __slots__ = ('id', 'value', 'exclude', 'partial', 'is_range', 'start', 'end', 'raw', '_json')
+
+    def __init__(self, id: str, value: Optional[str] = None, exclude: bool = False, partial: bool = False,
+                 is_range: bool = False, start: Optional[str] = None, end: Optional[str] = None,
+                 raw: Optional[Dict] = None):
+        self.id = id
+        self.value = value
+        self.exclude = exclude
+        self.partial = partial
+        self.is_range = is_range
+        self.start = start
+        self.end = end
+        self.raw = raw
+        self._json = None
+
+    def to_dict(self, id_case=str.lower) -> Dict:
+        if self.raw is not None:
+            data = dict(self.raw)
+            data['id'] = id_case(data['id'])
+            return data
+        data = {'exclude': self.exclude, 'id': id_case(self.id), 'isRange': self.is_range, 'partial': self.partial}
+        if self.is_range:
+            data['rangeValue'] = {'start': self.start, 'end': self.end}
+        else:
+            data['value'] = self.value
+        return data
+
+    def __repr__(self) -> str:
+        if self.is_range:
+            return f"Filter({self.id}, {self.start}..{self.end})"
+        return f"Filter({self.id}, {self.value!r})"
+
+
+class Query:
+    """
+    A reusable, validated query for an endpoint taking applied_filters.
+
+    Filters are validated once when the query is built and the request payload is serialized
+    once and cached. Derived queries (with_range, with_filter) reuse the already validated
+    filters and their serialized fragments, so only the changed filter is checked again.
+    """
+    ENDPOINT = None
+    RANGE_ID = None
+    VALID_ID = set()
+
+    def __init__(self, applied_filters: Iterable[Union[Filter, Dict]] = ()):
+        """
+        :param applied_filters: Filter objects or filter dictionaries in the format accepted by
+                                APIClient.logs. Dictionaries are not modified.
+        :raises ValueError: If a filter id is not valid or a range date is not in a valid format.
+        """
+        self._filters = tuple(self._validate(f) for f in applied_filters)
+        self._payload = None
+
+    @classmethod
+    def _derive(cls, filters: tuple) -> 'Query':
+        # Build from filters that were already validated
+        query = cls.__new__(cls)
+        query._filters = filters
+        query._payload = None
+        return query
+
+    @staticmethod
+    def _id_case(id: str) -> str:
+        return id.lower()
+
+    @classmethod
+    def _check_range(cls, start: Optional[str], end: Optional[str]):
+        for key, date in (('start', start), ('end', end)):
+            if not is_valid_date(date):
+                raise ValueError(f"The '{key}' date in 'rangeValue' must be in 'YYYY-MM-DDTHH:MM:SS.sssZ' format.")
+
+    @classmethod
+    def _check_id(cls, id: str) -> str:
+        id = id.upper()
+        if id not in cls.VALID_ID:
+            raise ValueError(f"Invalid filter ID. Must be one of {cls.VALID_ID}")
+        return id
+
+    @classmethod
+    def _validate(cls, f: Union[Filter, Dict]) -> Filter:
+        if isinstance(f, Filter):
+            raw = f.raw
+            f = f.to_dict(lambda id: id)
+        else:
+            raw = copy.deepcopy(f)
+        id = cls._check_id(f['id'])
+        if f.get('isRange'):
+            range_value = f.get('rangeValue', {})
+            start, end = range_value.get('start'), range_value.get('end')
+            cls._check_range(start, end)
+            return Filter(id, exclude=f.get('exclude', False), partial=f.get('partial', False),
+                          is_range=True, start=start, end=end, raw=raw)
+        return Filter(id, value=f.get('value'), exclude=f.get('exclude', False), partial=f.get('partial', False),
+                      raw=raw)
+
+    @property
+    def filters(self) -> tuple:
+        return self._filters
+
+    def _fragment(self, f: Filter) -> str:
+        if f._json is None:
+            f._json = json.dumps(f.to_dict(self._id_case))
+        return f._json
+
+    def payload(self) -> str:
+        """The serialized request body, built on first use"""
+        if self._payload is None:
+            self._payload = '{"applied_filters": [' + ', '.join(self._fragment(f) for f in self._filters) + ']}'
+        return self._payload
+
+    def applied_filters(self) -> List[Dict]:
+        """The filters as fresh dictionaries"""
+        return [f.to_dict(self._id_case) for f in self._filters]
+
+    def with_filter(self, f: Union[Filter, Dict]) -> 'Query':
+        """Return a new query with one more filter"""
+        return self._derive(self._filters + (self._validate(f),))
+
+    def with_range(self, start: str, end: str, id: Optional[str] = None) -> 'Query':
+        """
+        Return a new query with the range filter for id replaced (or added).
+
+        :param start: The range start, 'YYYY-MM-DDTHH:MM:SS.sssZ' or 'YYYY-MM-DD'.
+        :param end: The range end, 'YYYY-MM-DDTHH:MM:SS.sssZ' or 'YYYY-MM-DD'.
+        :param id: (Optional) The filter id. The default is DATETIME for logs and LAST_SEEN for passthrough.
+        """
+        id = self._check_id(id or self.RANGE_ID)
+        self._check_range(start, end)
+        existing = next((f for f in self._filters if f.id == id and f.is_range), None)
+        raw = None
+        if existing is not None and existing.raw is not None:
+            # Keep the caller's keys and id casing, only the range changes
+            raw = dict(existing.raw, isRange=True, rangeValue={'start': start, 'end': end})
+            raw.pop('value', None)
+        new = Filter(id, exclude=existing.exclude if existing else False,
+                     partial=existing.partial if existing else False, is_range=True, start=start, end=end, raw=raw)
+        if existing is None:
+            return self._derive(self._filters + (new,))
+        return self._derive(tuple(new if f is existing else f for f in self._filters))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._filters)})"
+
+
+class LogQuery(Query):
+    """
+    A reusable, validated query for the logs endpoint.
+
+    >>> query = LogQuery([{'id': 'QUERY_TYPE', 'value': 'A'}])
+    >>> api_client.logs(query.with_range('2023-06-01', '2023-06-02'))
+    """
+    ENDPOINT = '/logs'
+    RANGE_ID = 'DATETIME'
+    VALID_ID = {'DOMAIN', 'DOMAIN_2TLD', 'DOMAIN_TLD', 'DOMAIN_AGE', 'QUERY_TYPE', 'RESPONSE_CODE', 'TTL', 'NAMESERVER',
+                'NAMESERVER_2TLD', 'NAMESERVER_TLD', 'NAMESERVER_IP', 'A_RECORD', 'AAAA_RECORD', 'C_NAME',
+                'C_NAME_2TLD', 'C_NAME_TLD', 'REGISTRAR', 'REPUTATION', 'DATETIME'}
+
+
+class PassthroughQuery(Query):
+    """A reusable, validated query for the passthrough endpoint."""
+    ENDPOINT = '/passthrough'
+    RANGE_ID = 'LAST_SEEN'
+    VALID_ID = {'LAST_SEEN', 'ARTIFACT', 'HYAS_STATUS', 'ALT_STATUS', 'QUERY_COUNT'}
+
+    @staticmethod
+    def _id_case(id: str) -> str:
+        return id
+
+    @classmethod
+    def _check_id(cls, id: str) -> str:
+        if id.upper() not in cls.VALID_ID:
+            raise ValueError(f"Invalid id in filter: {id}. Must be one of {sorted(cls.VALID_ID)}")
+        return id.upper()
+
+    @classmethod
+    def _check_range(cls, start: Optional[str], end: Optional[str]):
+        # Either bound may be left open
+        if start and not is_valid_date(start):
+            raise ValueError(f"Invalid start date in filter: {start}. Dates should be in the format 'YYYY-MM-DDTHH:MM:SS'.")
+        if end and not is_valid_date(end):
+            raise ValueError(f"Invalid end date in filter: {end}. Dates should be in the format 'YYYY-MM-DDTHH:MM:SS'.")
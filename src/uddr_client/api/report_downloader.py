@@ -0,0 +1,177 @@
+import json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from ..response import Response
+
+MANIFEST_NAME = '.uddr_reports.json'
+
+
+class DownloadResult:
+    """The outcome of downloading a single report."""
+    __slots__ = ('report_id', 'path', 'size', 'status', 'seconds', 'error')
+
+    def __init__(self, report_id: str, path: str, size: int = 0, status: str = 'downloaded',
+                 seconds: float = 0.0, error: Optional[Exception] = None):
+        self.report_id = report_id
+        self.path = path
+        self.size = size
+        self.status = status  # 'downloaded', 'resumed', 'skipped' or 'failed'
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"DownloadResult({self.report_id}, {self.status}, {self.size} bytes)"
+
+
+class DownloadProgress:
+    """Running totals for a bulk download, passed to the progress callback."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second transferred so far (skipped files excluded)"""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def _add_bytes(self, n: int):
+        with self._lock:
+            self.bytes += n
+
+    def _finish(self, result: DownloadResult):
+        with self._lock:
+            self.completed += 1
+            if result.status == 'skipped':
+                self.skipped += 1
+            elif result.status == 'failed':
+                self.failed += 1
+
+    def __str__(self) -> str:
+        return (f"{self.completed}/{self.total} reports ({self.skipped} skipped, {self.failed} failed), "
+                f"{self.bytes / 1048576:.1f} MiB at {self.throughput / 1048576:.2f} MiB/s")
+
+
+class ReportDownloader:
+    """
+    Stream executive report PDFs to disk, several at a time.
+
+    Each report is written to <directory>/<report_id>.pdf through a .part file, in chunks,
+    so a PDF is never held in memory. Completed sizes are recorded in a manifest file in the
+    directory; reports whose file is present with the recorded size are skipped, and a
+    leftover .part file is resumed with a Range request.
+    """
+
+    def __init__(self, connection, directory: str, max_workers: int = 4, chunk_size: int = 65536,
+                 progress: Optional[Callable[[DownloadProgress, DownloadResult], None]] = None):
+        """
+        :param connection: The connection to download with.
+        :param directory: The directory the PDFs are written to. It is created if needed.
+        :param max_workers: The number of concurrent downloads.
+        :param chunk_size: The number of bytes read and written at a time.
+        :param progress: (Optional) A callable invoked as progress(DownloadProgress, DownloadResult) after each report.
+        """
+        self.connection = connection
+        self.directory = directory
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, int]:
+        try:
+            with open(self._manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, report_id: str, size: int):
+        with self._lock:
+            self._manifest[report_id] = size
+            tmp = self._manifest_path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp, self._manifest_path)
+
+    def path(self, report_id: str) -> str:
+        return os.path.join(self.directory, f'{report_id}.pdf')
+
+    def is_complete(self, report_id: str) -> bool:
+        """True if the report's file exists with the size recorded when it finished downloading"""
+        path = self.path(report_id)
+        size = self._manifest.get(report_id)
+        return size is not None and os.path.exists(path) and os.path.getsize(path) == size
+
+    def _download(self, report_id: str, stats: DownloadProgress) -> DownloadResult:
+        path = self.path(report_id)
+        if self.is_complete(report_id):
+            return DownloadResult(report_id, path, os.path.getsize(path), status='skipped')
+
+        part = path + '.part'
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        data = json.dumps({'applied_filters': {'report_id': report_id}})
+        start = time.monotonic()
+        try:
+            try:
+                response = self.connection.post_stream('/report', data, offset=offset)
+            except Exception:
+                if offset == 0:
+                    raise
+                # The server rejected the range (e.g. 416), start over
+                offset = 0
+                response = self.connection.post_stream('/report', data)
+
+            # 206 means the server honoured the Range header, anything else is the full body
+            resumed = offset > 0 and response.status_code == 206
+            try:
+                with open(part, 'ab' if resumed else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if chunk:
+                            f.write(chunk)
+                            stats._add_bytes(len(chunk))
+            finally:
+                response.close()
+
+            os.replace(part, path)
+            size = os.path.getsize(path)
+            self._record(report_id, size)
+            return DownloadResult(report_id, path, size, status='resumed' if resumed else 'downloaded',
+                                  seconds=time.monotonic() - start)
+        except Exception as e:
+            # Keep the .part file so the next run can resume it
+            return DownloadResult(report_id, path, status='failed', seconds=time.monotonic() - start, error=e)
+
+    def download(self, reports: Union[Response, Iterable[Union[str, dict]]]) -> List[DownloadResult]:
+        """
+        Download reports concurrently.
+
+        :param reports: A reports() Response, report dicts or report_id strings.
+        :return: A list of DownloadResult in input order.
+        """
+        if isinstance(reports, Response):
+            reports = reports.get('reports', [])
+        report_ids = [r.get('report_id') if isinstance(r, dict) else r for r in reports]
+        stats = DownloadProgress(len(report_ids))
+
+        def task(report_id: str) -> DownloadResult:
+            result = self._download(report_id, stats)
+            stats._finish(result)
+            if self.progress is not None:
+                self.progress(stats, result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(task, report_ids))
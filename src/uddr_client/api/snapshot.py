@@ -0,0 +1,118 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from ..response import Response
+
+# The panels that make up the UDDR overview page, as (endpoint, query_type) pairs.
+PANELS = (
+    ('summary', 'TOTAL'),
+    ('summary', 'BLOCKED'),
+    ('summary', 'INDICATORS'),
+    ('bar', 'BLOCK_QUERIES'),
+    ('bar', 'NO_ANSWER_QUERIES'),
+    ('bar', 'TOR_PROX_VPN_QUERIES'),
+    ('bar', 'SUSPICIOUS_NAMESERVER_QUERIES'),
+    ('histogram', 'QUERIES'),
+    ('histogram', 'BLOCKED_QUERIES'),
+    ('aggregates', 'DOMAIN'),
+    ('aggregates', 'FQDN'),
+    ('aggregates', 'COUNTRY'),
+    ('aggregates', 'TLD'),
+    ('aggregates', 'REGISTRAR'),
+)
+
+
+class Panel:
+    """The result of a single overview endpoint call within a snapshot."""
+    __slots__ = ('endpoint', 'query_type', 'response', 'error')
+
+    def __init__(self, endpoint: str, query_type: str,
+                 response: Optional[Response] = None, error: Optional[Exception] = None):
+        self.endpoint = endpoint
+        self.query_type = query_type
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def status(self) -> dict:
+        if self.ok:
+            return {'endpoint': self.endpoint, 'query_type': self.query_type, 'ok': True}
+        return {'endpoint': self.endpoint, 'query_type': self.query_type, 'ok': False, 'error': str(self.error)}
+
+    def __repr__(self) -> str:
+        state = 'ok' if self.ok else f'error={self.error!r}'
+        return f"Panel({self.endpoint}/{self.query_type}, {state})"
+
+
+class Snapshot:
+    """All overview panels fetched in one go, keyed by (endpoint, query_type)."""
+    __slots__ = ('panels',)
+
+    def __init__(self, panels: List[Panel]):
+        self.panels = {(p.endpoint, p.query_type): p for p in panels}
+
+    def __str__(self) -> str:
+        return json.dumps(self.raw())
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __getitem__(self, key: Tuple[str, str]) -> Panel:
+        endpoint, query_type = key
+        return self.panels[(endpoint.lower(), query_type.upper())]
+
+    def get(self, endpoint: str, query_type: str, default: Any = None) -> Optional[Response]:
+        """Get the Response for a panel, or default if the panel failed or is missing"""
+        panel = self.panels.get((endpoint.lower(), query_type.upper()))
+        if panel is None or not panel.ok:
+            return default
+        return panel.response
+
+    @property
+    def ok(self) -> bool:
+        return all(p.ok for p in self.panels.values())
+
+    def failed(self) -> List[Panel]:
+        """Return the panels whose call raised an error or returned an HTTP error status"""
+        return [p for p in self.panels.values() if not p.ok]
+
+    def status(self) -> List[dict]:
+        """Return the per-panel success/failure status"""
+        return [p.status() for p in self.panels.values()]
+
+    def raw(self) -> Dict[str, Dict[str, Any]]:
+        """Return the panel data nested as {endpoint: {query_type: data}}, failed panels are None"""
+        data = {}
+        for (endpoint, query_type), panel in self.panels.items():
+            data.setdefault(endpoint, {})[query_type] = panel.response.raw() if panel.ok else None
+        return data
+
+
+def fetch_snapshot(api_client, max_workers: int = len(PANELS), **kwargs) -> Snapshot:
+    """
+    Call every overview endpoint concurrently and collect the results.
+
+    :param api_client: The APIClient whose pooled connection is used. HTTP error statuses are
+                       raised on a strict copy of it, so they mark the panel failed.
+    :param max_workers: The number of concurrent requests.
+    :param kwargs: Extra parameters passed to the aggregates calls (e.g. top_count).
+    :return: A Snapshot.
+    """
+    api_client = type(api_client)(api_client.connection.strict())
+
+    def call(endpoint: str, query_type: str) -> Panel:
+        try:
+            if endpoint == 'aggregates':
+                response = api_client.aggregates(query_type, **kwargs)
+            else:
+                response = getattr(api_client, endpoint)(query_type)
+            return Panel(endpoint, query_type, response=response)
+        except Exception as e:
+            return Panel(endpoint, query_type, error=e)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(call, endpoint, query_type) for endpoint, query_type in PANELS]
+        return Snapshot([f.result() for f in futures])
@@ -0,0 +1,399 @@
+"""
+The `uddr` command-line entry point for batch jobs.
+
+    uddr lookup iocs.txt -c 32 > verdicts.ndjson
+    uddr logs --start 2023-06-01 --end 2023-06-02 --window 1h --format parquet -o logs.parquet
+    uddr reports --start 2023-01-01 --end 2023-12-31 -d reports/
+    uddr snapshot > overview.json
+    uddr lookup iocs.txt --profile > /dev/null     # per-phase timing breakdown on stderr
+
+The API key is read from --api-key, the UDDR_API_KEY environment variable or the .env file;
+nothing is prompted for. Heavy dependencies (pandas, pyarrow) are only imported by the
+commands that need them.
+"""
+import argparse, contextlib, csv, datetime, json, os, re, sys, time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+class Progress:
+    """A throttled one-line progress/throughput display on stderr."""
+
+    def __init__(self, label: str, unit: str = 'items', enabled: bool = True, stream: TextIO = sys.stderr,
+                 interval: float = 0.5):
+        self.label = label
+        self.unit = unit
+        self.quiet = not enabled
+        # Redraw in place only on a terminal, otherwise just print the summary at the end
+        self.enabled = enabled and stream.isatty()
+        self.stream = stream
+        self.interval = interval
+        self.count = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._last = 0.0
+
+    def update(self, n: int = 1, error: bool = False):
+        self.count += n
+        if error:
+            self.errors += 1
+        now = time.monotonic()
+        if self.enabled and now - self._last >= self.interval:
+            self._last = now
+            self.stream.write('\r' + self.line())
+            self.stream.flush()
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        errors = f', {self.errors} errors' if self.errors else ''
+        return f"{self.label}: {self.count} {self.unit}{errors} in {elapsed:.1f}s ({rate:.1f} {self.unit}/s)"
+
+    def finish(self):
+        if self.quiet:
+            return
+        if self.enabled:
+            self.stream.write('\r' + self.line() + '\n')
+        else:
+            self.stream.write(self.line() + '\n')
+        self.stream.flush()
+
+
+def _flatten(record: dict, prefix: str = '') -> dict:
+    """Flatten nested dicts into dotted keys, like pandas.json_normalize"""
+    flat = {}
+    for key, value in record.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + '.'))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+class RecordWriter:
+    """
+    Stream records to CSV, NDJSON or Parquet.
+
+    CSV and Parquet columns are the given fields, or the keys of the first batch written. A later
+    record with a field outside them raises ValueError rather than silently losing the field.
+    """
+
+    def __init__(self, fmt: str, output: Optional[str], fields: Optional[List[str]] = None):
+        if fmt == 'parquet' and output is None:
+            raise SystemExit("uddr: --format parquet requires --output")
+        self.fmt = fmt
+        self.output = output
+        self._fp = None
+        self._csv = None
+        self._parquet = None
+        self._fields = list(fields) if fields is not None else None
+
+    def _open_text(self) -> TextIO:
+        if self._fp is None:
+            self._fp = open(self.output, 'w', newline='') if self.output else sys.stdout
+        return self._fp
+
+    def _columns(self, rows: List[dict]) -> List[str]:
+        if self._fields is None:
+            self._fields = list(dict.fromkeys(k for row in rows for k in row))
+        else:
+            known = set(self._fields)
+            extra = list(dict.fromkeys(k for row in rows for k in row if k not in known))
+            if extra:
+                raise ValueError(f"records have fields {extra} that are not in the {self.fmt} columns "
+                                 f"fixed by the first records; use --format ndjson for records with varying fields")
+        return self._fields
+
+    def write(self, records: List[dict]):
+        if not records:
+            return
+        if self.fmt == 'ndjson':
+            fp = self._open_text()
+            for record in records:
+                fp.write(json.dumps(record) + '\n')
+        elif self.fmt == 'csv':
+            fp = self._open_text()
+            rows = [_flatten(r) for r in records]
+            fields = self._columns(rows)
+            if self._csv is None:
+                self._csv = csv.DictWriter(fp, fieldnames=fields)
+                self._csv.writeheader()
+            self._csv.writerows(rows)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("uddr: --format parquet requires pyarrow (pip install pyarrow)")
+            rows = [_flatten(r) for r in records]
+            fields = self._columns(rows)
+            if self._parquet is None:
+                # Every column is written as a string so pages with different inferred types line up
+                self._schema = pa.schema([(name, pa.string()) for name in fields])
+                self._parquet = pq.ParquetWriter(self.output, self._schema)
+            columns = {name: [None if row.get(name) is None else str(row.get(name)) for row in rows]
+                       for name in fields}
+            self._parquet.write_table(pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._fp is not None and self._fp is not sys.stdout:
+            self._fp.close()
+        elif self._fp is sys.stdout:
+            sys.stdout.flush()
+
+
+def _client(args):
+    # Imported here so `uddr --help` doesn't pay for the client's imports
+    from .client import Client
+    transport = None
+    if args.replay:
+        from .transport import ReplayTransport
+        transport = ReplayTransport(args.replay)
+    return Client(api_key=args.api_key or os.environ.get('UDDR_API_KEY'), transport=transport)
+
+
+def _doh(args, **kwargs):
+    """A DOHClient for --org, reporting organization problems on stderr so stdout stays data only"""
+    api = _client(args).api()
+    organizations = api.account().user().organizations().get('organizations', [])
+    names = [org.get('organization_name') for org in organizations]
+    org_name = args.org
+    if org_name is None and len(organizations) == 1:
+        org_name = names[0]
+    if org_name is None or org_name not in names:
+        reason = f"unknown organization '{org_name}'" if org_name else "several organizations, pass --org"
+        print(f"uddr: {reason}. Available: {', '.join(str(n) for n in names) or 'none'}", file=sys.stderr)
+        return None
+    from .doh.doh_client import DOHClient
+    # DOHClient reports some problems with print(), keep that off the data stream
+    with contextlib.redirect_stdout(sys.stderr):
+        return DOHClient(api.connection, api, org_name, organizations=organizations, **kwargs)
+
+
+def _read_iocs(paths: List[str]) -> Iterator[str]:
+    for path in paths or ['-']:
+        fp = sys.stdin if path == '-' else open(path, 'r')
+        try:
+            for line in fp:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    yield line
+        finally:
+            if fp is not sys.stdin:
+                fp.close()
+
+
+_WINDOW_RE = re.compile(r'^(\d+)\s*([smhd])$')
+_WINDOW_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def _parse_window(value: str) -> datetime.timedelta:
+    match = _WINDOW_RE.match(value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid window '{value}', expected e.g. 30m, 1h or 1d")
+    return datetime.timedelta(**{_WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"invalid time '{value}', expected YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+
+
+def _format_time(value: datetime.datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f'{value.microsecond // 1000:03d}Z'
+
+
+# Commands
+
+# The lookup record fields, fixed so CSV columns don't depend on the first IOC's outcome
+LOOKUP_FIELDS = ['ioc', 'name', 'status', 'blocked', 'answers', 'indexed', 'error']
+
+
+def cmd_lookup(args) -> int:
+    from .doh.lookup_result import LookupResult
+
+    kwargs = {}
+    if args.index:
+        from .doh.verdict_index import VerdictIndex
+        options = {'cache_negative': args.cache_negative}
+        kwargs['verdict_index'] = VerdictIndex.load(args.index, **options) if os.path.exists(args.index) \
+            else VerdictIndex(**options)
+    doh = _doh(args, **kwargs)
+    if doh is None or doh.client_id is None:
+        return 2
+
+    progress = Progress('lookup', 'lookups', enabled=not args.quiet)
+    writer = RecordWriter(args.format, args.output, LOOKUP_FIELDS)
+    try:
+        for source, name, lookup in doh.lookup_many(_read_iocs(args.files), max_workers=args.concurrency):
+            if isinstance(lookup, Exception):
+                record = {'ioc': source, 'name': name, 'error': str(lookup)}
+            elif isinstance(lookup, LookupResult):
+                # Answered from the verdict index, no DoH query was made
+                record = {'ioc': source, 'name': lookup.ioc, 'status': None, 'blocked': lookup.blocked,
+                          'answers': [], 'indexed': True}
+            else:
+                record = {
+                    'ioc': source,
+                    'name': lookup.ioc,
+                    'status': lookup.status()['message'],
+                    'blocked': lookup.blocked,
+                    'answers': [a.get('data') for a in lookup.answer()],
+                }
+            writer.write([record])
+            progress.update(error='error' in record)
+    finally:
+        writer.close()
+        progress.finish()
+        if args.index:
+            doh.verdict_index.save(args.index)
+    return 0
+
+
+def cmd_logs(args) -> int:
+    from .api.query import LogQuery
+
+    filters = []
+    for item in args.filter or []:
+        if '=' not in item:
+            print(f"uddr: invalid --filter '{item}', expected ID=VALUE", file=sys.stderr)
+            return 2
+        filter_id, value = item.split('=', 1)
+        filters.append({'id': filter_id, 'value': value})
+    query = LogQuery(filters)
+    api = _client(args).api()
+
+    progress = Progress('logs', 'records', enabled=not args.quiet)
+    writer = RecordWriter(args.format, args.output)
+    window = args.window or (args.end - args.start)
+    start = args.start
+    try:
+        while start < args.end:
+            end = min(start + window, args.end)
+            response = api.logs(query.with_range(_format_time(start), _format_time(end)))
+            records = response.get('logs', []) if isinstance(response.raw(), dict) else []
+            writer.write(records)
+            progress.update(len(records))
+            start = end
+    finally:
+        writer.close()
+        progress.finish()
+    return 0
+
+
+def cmd_reports(args) -> int:
+    api = _client(args).api()
+    progress = Progress('reports', 'reports', enabled=not args.quiet)
+
+    def report_progress(stats, result):
+        progress.update(error=result.status == 'failed')
+        if result.status == 'failed':
+            print(f"\nuddr: {result.report_id} failed: {result.error}", file=sys.stderr)
+
+    start = _format_time(args.start) if args.start else None
+    end = _format_time(args.end) if args.end else None
+    results = api.download_reports(args.directory, start, end, max_workers=args.concurrency,
+                                   progress=report_progress)
+    progress.finish()
+    downloaded = sum(r.size for r in results if r.status in ('downloaded', 'resumed'))
+    skipped = sum(1 for r in results if r.status == 'skipped')
+    print(f"{len(results)} reports, {skipped} already present, {downloaded / 1048576:.1f} MiB downloaded",
+          file=sys.stderr)
+    return 1 if any(r.status == 'failed' for r in results) else 0
+
+
+def cmd_snapshot(args) -> int:
+    kwargs = {'top_count': args.top_count} if args.top_count else {}
+    snapshot = _client(args).api().snapshot(**kwargs)
+    json.dump({'panels': snapshot.raw(), 'status': snapshot.status()}, sys.stdout, indent=args.indent)
+    sys.stdout.write('\n')
+    return 0 if snapshot.ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--api-key', help='The API key. Defaults to UDDR_API_KEY from the environment or .env')
+    common.add_argument('-q', '--quiet', action='store_true', help='Hide the progress display')
+    common.add_argument('--replay', metavar='CASSETTE', help='Answer requests from a recorded cassette (no network)')
+    common.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help='Time each phase and print the breakdown to stderr, or save it to FILE (.json/.csv)')
+    common.add_argument('--sample', metavar='FILE', help='Run a sampling profiler and save collapsed stacks to FILE')
+
+    parser = argparse.ArgumentParser(prog='uddr', description='Batch jobs against the UDDR API and resolvers.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    lookup = commands.add_parser('lookup', parents=[common], help='Bulk DoH checks of IOCs (domains, URLs, IPs, CIDR blocks)')
+    lookup.add_argument('files', nargs='*', help="Files with one IOC per line. Defaults to stdin ('-')")
+    lookup.add_argument('-c', '--concurrency', type=int, default=16, help='Concurrent lookups (default 16)')
+    lookup.add_argument('--org', help='The organization name, if the user has several')
+    lookup.add_argument('-f', '--format', choices=('ndjson', 'csv'), default='ndjson')
+    lookup.add_argument('-o', '--output', help='The output file. Defaults to stdout')
+    lookup.add_argument('--index', metavar='FILE', help='A verdict index file: known verdicts are answered '
+                        'locally and new verdicts are saved back to it')
+    lookup.add_argument('--cache-negative', action='store_true', help='Also save not-blocked verdicts to the index, '
+                        'so those names are not looked up again (by default only blocked verdicts are saved)')
+    lookup.set_defaults(func=cmd_lookup)
+
+    logs = commands.add_parser('logs', parents=[common], help='Export logs in time windows')
+    logs.add_argument('--start', type=_parse_time, required=True, help='YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS (UTC)')
+    logs.add_argument('--end', type=_parse_time, required=True, help='YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS (UTC)')
+    logs.add_argument('--window', type=_parse_window, help='Query window, e.g. 15m, 1h, 1d. Defaults to the whole range')
+    logs.add_argument('--filter', action='append', metavar='ID=VALUE', help='A logs filter, may be repeated')
+    logs.add_argument('-f', '--format', choices=('csv', 'ndjson', 'parquet'), default='ndjson')
+    logs.add_argument('-o', '--output', help='The output file. Defaults to stdout (not for parquet)')
+    logs.set_defaults(func=cmd_logs)
+
+    reports = commands.add_parser('reports', parents=[common], help='Download executive report PDFs')
+    reports.add_argument('--start', type=_parse_time, help='YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS (UTC)')
+    reports.add_argument('--end', type=_parse_time, help='YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS (UTC)')
+    reports.add_argument('-d', '--directory', default='.', help='The download directory (default .)')
+    reports.add_argument('-c', '--concurrency', type=int, default=4, help='Concurrent downloads (default 4)')
+    reports.set_defaults(func=cmd_reports)
+
+    snapshot = commands.add_parser('snapshot', parents=[common], help='Fetch every overview panel as JSON')
+    snapshot.add_argument('--top-count', type=int, help='The number of aggregate values per panel')
+    snapshot.add_argument('--indent', type=int, default=None, help='Pretty-print the JSON')
+    snapshot.set_defaults(func=cmd_snapshot)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'start', None) and getattr(args, 'end', None) and args.start >= args.end:
+        print("uddr: --start must be before --end", file=sys.stderr)
+        return 2
+    profiler = sampler = None
+    if args.profile or args.sample:
+        from .profiling import Profiler, SamplingProfiler
+        profiler = Profiler().enable() if args.profile else None
+        sampler = SamplingProfiler().start() if args.sample else None
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"uddr: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            if args.profile == '-':
+                profiler.print_report()
+            else:
+                profiler.save(args.profile)
+        if sampler is not None:
+            sampler.stop()
+            sampler.save_collapsed(args.sample)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@ from .connection import Connection
 from .response import Response
 from .doh import DOHClient
 from .api import APIClient
+from .fanout import FanOut
 import json, datetime, os
 from typing import Dict, List, Optional
 from decouple import config
@@ -11,10 +12,11 @@ class Client:
         """Initialize the client.
         
         :param api_key: (Optional) UDDR user's API key if not set in the .env file
+        :param transport: (Optional) A RecordingTransport or ReplayTransport from uddr_client.transport
         """
         config_settings = config._load('.env') or {}
         api_key = kwargs.get('api_key') or config_settings.get('UDDR_API_KEY')
-        self.connection = Connection(api_key)
+        self.connection = Connection(api_key, transport=kwargs.get('transport'))
 
     @staticmethod
     def setup(**kwargs):
@@ -62,8 +64,25 @@ class Client:
         with open('.env', 'w') as f:
             f.writelines(lines)
 
-    def doh(self, org_name: Optional[str] = None) -> Response:
-        return DOHClient(self.connection, self.api(), org_name)
+    def doh(self, org_name: Optional[str] = None, **kwargs) -> Response:
+        """
+        Create a DoH client.
+
+        :param org_name: (Optional) The organization to query as, if the user has several.
+        :param hedging: (Optional) A HedgingPolicy to cut tail latency with duplicate requests.
+        :param verdict_index: (Optional) A VerdictIndex of known verdicts to pre-screen bulk lookups.
+        """
+        return DOHClient(self.connection, self.api(), org_name, **kwargs)
         
     def api(self) -> Response:
-        return APIClient(self.connection)
\ No newline at end of file
+        return APIClient(self.connection)
+
+    def fanout(self, org_names: Optional[List[str]] = None, **kwargs) -> FanOut:
+        """
+        Run lookups or API queries across several organizations concurrently.
+
+        :param org_names: (Optional) The organization names to target. The default is every organization.
+        :param max_workers: (Optional) The total number of concurrent calls.
+        :param max_per_org: (Optional) The maximum number of concurrent calls per organization.
+        """
+        return FanOut(self.connection, self.api(), org_names, **kwargs)
\ No newline at end of file
@@ -1,13 +1,31 @@
+import copy
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Union, Optional
+from urllib.parse import urlsplit
 from decouple import config
+from .profiling import phase
 
 class Connection:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, transport=None, raise_for_status: bool = False):
         self.api_endpoint = 'https://ddr.ultradns.com/api/protect/ext'
         self.pvt_api_endpoint = 'https://api.ddr.ultradns.com'
         self.doh_endpoint = 'https://rcsv.ddr.ultradns.com'
 
+        # A single pooled session keeps connections alive between calls and is
+        # shared by the concurrent helpers (e.g. APIClient.snapshot).
+        # A transport (see uddr_client.transport) replaces it, e.g. to record or replay traffic.
+        if transport is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        else:
+            self.session = transport
+
+        # Raise requests.HTTPError for 4xx/5xx responses instead of returning their body as data
+        self.raise_for_status = raise_for_status
+
         if api_key is None:
             try:
                 self.api_key = config('UDDR_API_KEY')
@@ -16,6 +34,12 @@ class Connection:
         else:
             self.api_key = api_key
 
+    def strict(self) -> 'Connection':
+        """A copy sharing this connection's session and key that raises on HTTP error statuses"""
+        connection = copy.copy(self)
+        connection.raise_for_status = True
+        return connection
+
     def get(self, uri: str, client_id: Optional[bool] = None, pvt: Optional[bool] = False,
             params: Optional[Dict] = None) -> Union[Dict, str, bytes]:
         if client_id is not None:
@@ -31,6 +55,33 @@ class Connection:
             return self._do_call(self.pvt_api_endpoint+uri, 'POST', data=data, accept=accept)
         else:
             return self._do_call(self.api_endpoint+uri, 'POST', data=data, accept=accept)
+
+    def post_stream(self, uri: str, data: Optional[Union[Dict, str]] = None,
+                    accept: str = 'application/pdf', offset: int = 0,
+                    pvt: Optional[bool] = False) -> requests.Response:
+        """
+        POST and return the raw, streaming requests.Response instead of the decoded body.
+
+        The caller reads it with iter_content() and must close it.
+
+        :param offset: (Optional) Ask the server to start at this byte via a Range header, for resuming.
+        """
+        endpoint = self.pvt_api_endpoint if pvt is True else self.api_endpoint
+        headers = self._headers('application/json', accept)
+        if offset > 0:
+            headers['Range'] = f'bytes={offset}-'
+        response = self.session.request('POST', endpoint+uri, data=data, headers=headers, stream=True)
+        response.raise_for_status()
+        return response
+
+    def _headers(self, c_type: str, accept: str) -> Dict:
+        if self.api_key is None:
+            raise ValueError("No API Key provided. Please set it via argument or call Client.setup.")
+        return {
+            'Content-Type': c_type,
+            'X-API-Key': self.api_key,
+            'Accept': accept
+        }
         
     def _do_call(self, uri: str, method: str, 
                  data: Optional[Union[Dict, str]] = None, 
@@ -38,28 +89,26 @@ class Connection:
                  c_type: str = 'application/json',
                  params: Optional[Dict] = None) -> Union[Dict, str, bytes]:
         if params is None:
-            if self.api_key is None:
-                raise ValueError("No API Key provided. Please set it via argument or call Client.setup.")
-                
-            headers = {
-                'Content-Type': c_type,
-                'X-API-Key': self.api_key
-            }
+            headers = self._headers(c_type, accept)
         else:
-            headers = { 'Content-Type': c_type }
-            
-        headers['Accept'] = accept
-        response = requests.request(
-            method, 
-            uri, 
-            data=data, 
-            headers=headers,
-            params=params
-        )
+            headers = { 'Content-Type': c_type, 'Accept': accept }
+        # Profiling label: DoH URIs end with the client ID, so they are grouped together
+        endpoint = 'doh' if params is not None else urlsplit(uri).path
+        with phase('network', endpoint):
+            response = self.session.request(
+                method, 
+                uri, 
+                data=data, 
+                headers=headers,
+                params=params
+            )
 
         # For debugging
         # print(response.url)
 
+        if self.raise_for_status:
+            response.raise_for_status()
+
         # Check for No Content
         if response.status_code == requests.codes.no_content:
             return {}
@@ -70,6 +119,7 @@ class Connection:
 
         # Attempt to return JSON, if not possible return text.
         try:
-            return response.json()
+            with phase('json_decode', endpoint):
+                return response.json()
         except ValueError:
             return response.text
\ No newline at end of file
@@ -1 +1,7 @@
-from .doh_client import DOHClient
\ No newline at end of file
+from .doh_client import DOHClient
+from .hedging import HedgingPolicy
+from .lookup_result import LookupResult, LookupBatch, Profile
+from .monitor import WatchlistMonitor, ChangeEvent, NDJSONSink
+from .ioc_parser import IOCParser, NetblockParser, InvalidIOCError
+from .bulk import BlockSummary
+from .verdict_index import VerdictIndex
\ No newline at end of file
@@ -0,0 +1,112 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Tuple, Union
+from .ioc_parser import InvalidIOCError, NetblockParser
+from .lookup_result import LookupResult
+
+
+class BlockSummary:
+    """Aggregated PTR lookup results for one CIDR block or address range."""
+    __slots__ = ('block', 'addresses', 'resolved', 'blocked', 'errors', 'ptr_targets')
+
+    def __init__(self, block: str):
+        self.block = block
+        self.addresses = 0
+        self.resolved = 0
+        self.blocked = 0
+        self.errors = 0
+        self.ptr_targets = set()
+
+    def add(self, lookup: Union[object, Exception]):
+        self.addresses += 1
+        if isinstance(lookup, Exception):
+            self.errors += 1
+            return
+        targets = [a.get('data') for a in lookup.answer() if a.get('type') == 12]
+        if targets:
+            self.resolved += 1
+            self.ptr_targets.update(t.rstrip('.') for t in targets)
+        if lookup.blocked:
+            self.blocked += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'block': self.block,
+            'addresses': self.addresses,
+            'resolved': self.resolved,
+            'blocked': self.blocked,
+            'errors': self.errors,
+            'ptr_targets': sorted(self.ptr_targets),
+        }
+
+    def __repr__(self) -> str:
+        return (f"BlockSummary({self.block!r}, addresses={self.addresses}, resolved={self.resolved}, "
+                f"blocked={self.blocked}, ptr_targets={len(self.ptr_targets)})")
+
+
+def _names(iocs: Iterable[str]) -> Iterator[Tuple[str, str, object]]:
+    """(source, name, error) for each name to look up, netblocks are expanded lazily"""
+    for ioc in iocs:
+        if NetblockParser.is_netblock(ioc):
+            try:
+                block = NetblockParser(ioc)
+            except InvalidIOCError as e:
+                yield ioc, ioc, e
+                continue
+            for name in block:
+                yield str(block), name, None
+        else:
+            # Lookup runs the IOC through IOCParser itself
+            yield ioc, ioc, None
+
+
+def iter_lookups(doh_client, iocs: Iterable[str], max_workers: int = 8) -> Iterator[Tuple[str, str, object]]:
+    """
+    Look up a stream of IOCs with bounded concurrency.
+
+    Netblocks are expanded lazily into PTR names. At most 2 * max_workers lookups are queued
+    at any time, so the input is consumed only as fast as results are taken.
+
+    If the client has a verdict_index, names with a known verdict are answered from it with a
+    LookupResult (no rcode or answers) instead of a DoH query, and the verdicts of the
+    lookups that do run are offered to it (see VerdictIndex.add_lookup).
+
+    :return: (source, name, result) tuples in input order, where result is a Lookup, a LookupResult
+             from the verdict index or the Exception raised for that name.
+    """
+    max_workers = max(1, max_workers)
+    index = getattr(doh_client, 'verdict_index', None)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for source, name, error in _names(iocs):
+            if error is None and index is not None:
+                verdict = index.match(name)
+                if verdict is not None:
+                    error = LookupResult(name, None, None, verdict)
+            pending.append((source, name, error if error is not None else executor.submit(doh_client.lookup, name)))
+            if len(pending) >= 2 * max_workers:
+                yield _result(index, *pending.popleft())
+        while pending:
+            yield _result(index, *pending.popleft())
+
+
+def _result(index, source: str, name: str, future) -> Tuple[str, str, object]:
+    # Precomputed: a parse error or a verdict from the index
+    if isinstance(future, (Exception, LookupResult)):
+        return source, name, future
+    try:
+        lookup = future.result()
+    except Exception as e:
+        return source, name, e
+    if index is not None:
+        index.add_lookup(lookup)
+    return source, name, lookup
+
+
+def summarize_blocks(doh_client, blocks: Iterable[str], max_workers: int = 8) -> Dict[str, BlockSummary]:
+    """Look up every address in the blocks and summarize the results per block"""
+    blocks = [str(NetblockParser(block)) for block in blocks]
+    summaries = {block: BlockSummary(block) for block in blocks}
+    for source, _, lookup in iter_lookups(doh_client, blocks, max_workers):
+        summaries[source].add(lookup)
+    return summaries
@@ -1,19 +1,32 @@
-import json, socket, os
+import json, socket, os, threading
+from concurrent.futures import ThreadPoolExecutor
 from decouple import config
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from ..response import Response
 from ..connection import Connection
 from .ioc_parser import IOCParser
+from .hedging import HedgingPolicy
+from .lookup_result import LookupResult, Profile, rcode_info
+from .bulk import BlockSummary, iter_lookups, summarize_blocks
+from .verdict_index import VerdictIndex
 
 
 class DOHClient:
+    # The record types with a property on Lookup, fetched by fetch_all() by default
+    RECORD_TYPES = ('A', 'AAAA', 'CNAME', 'MX', 'NS', 'SOA', 'SRV', 'TXT', 'CAA', 'DS', 'DNSKEY')
+
     class Lookup:
-        def __init__(self, doh_client, ioc: str):
+        def __init__(self, doh_client, ioc: str, types: Optional[Iterable[str]] = None):
             self.doh_client = doh_client
             self.ioc = str(IOCParser(ioc))
             self.type, self.ioc = self._determine_type(self.ioc)
             self._cache = {} # Initialize a cache
-            self.response = self._query()
+            self._status = {} # The rcode of each record type query
+            if types:
+                # Run the main query alongside the record type queries instead of before them
+                self.response = self._fetch(types, main=True)
+            else:
+                self.response = self._query()
             self.blocked = self._is_blocked()
 
         def _determine_type(self, ioc: str) -> tuple:
@@ -29,15 +42,45 @@ class DOHClient:
                     record_type = self.type
                 if record_type is not None:
                     params['type'] = record_type
-                return Response(self.doh_client.connection.get('/', client_id=self.doh_client.client_id, params=params))
+                return Response(self.doh_client._get(params))
             else:
                 raise ValueError("No Client ID provided. Please set it via argument or call DOHClient.setup.")
 
         def _get_record(self, record_type: str) -> List[dict]:
             if record_type not in self._cache:
-                self._cache[record_type] = self._query(record_type).get('Answer', [])
+                response = self._query(record_type)
+                self._status[record_type] = response.get('Status')
+                self._cache[record_type] = response.get('Answer', [])
             return self._cache[record_type]
 
+        def _fetch(self, types: Iterable[str], main: bool = False) -> Optional[Response]:
+            """Query every uncached record type (and the main query if main is set) concurrently"""
+            wanted = [t.upper() for t in types]
+            if self.doh_client.block_page_ip is not None:
+                wanted.append('A')  # Needed by _is_blocked
+            missing = [t for t in dict.fromkeys(wanted) if t not in self._cache]
+
+            jobs = [(t, self.doh_client._submit(self._query, t)) for t in missing]
+            response = self._query() if main else None
+            for record_type, future in jobs:
+                result = future.result()
+                self._status[record_type] = result.get('Status')
+                self._cache[record_type] = result.get('Answer', [])
+            return response
+
+        def fetch_all(self, types: Optional[Iterable[str]] = None) -> Profile:
+            """
+            Fetch several record types at once, concurrently, and fill the record cache.
+
+            :param types: (Optional) The record types. The default is DOHClient.RECORD_TYPES.
+            :return: A Profile with the answers and status of every requested type.
+            """
+            types = [t.upper() for t in (types or DOHClient.RECORD_TYPES)]
+            self._fetch(types)
+            return Profile(self.ioc, self.blocked,
+                           {t: self._cache[t] for t in types},
+                           {t: self._status.get(t) for t in types})
+
         def _is_blocked(self) -> bool:
             if self.doh_client.block_page_ip is not None:
                 a_records = self._get_record('A')
@@ -92,32 +135,7 @@ class DOHClient:
             return self._get_record('DNSKEY')
 
         def status(self) -> dict:
-            status = self.response.get('Status')
-            reason = {'rcode': status}
-            if status == 0:
-                reason.update({'message': 'NOERROR', 'desc': 'DNS Query received by server'})
-            elif status == 1:
-                reason.update({'message': 'FORMERR', 'desc': 'DNS Query Format Error'})
-            elif status == 2:
-                reason.update({'message': 'SERVFAIL', 'desc': 'Server failed to complete the DNS request'})
-            elif status == 3:
-                reason.update({'message': 'NXDOMAIN', 'desc': 'Domain name does not exist'})
-            elif status == 4:
-                reason.update({'message': 'NOTIMP', 'desc': 'Function not implemented'})
-            elif status == 5:
-                reason.update({'message': 'REFUSED', 'desc': 'The server refused to answer for the query'})
-            elif status == 6:
-                reason.update({'message': 'YXDOMAIN', 'desc': 'Name that should not exist, does exist'})
-            elif status == 7:
-                reason.update({'message': 'XRRSET', 'desc': 'RRset that should not exist, does exist'})
-            elif status == 8:
-                reason.update({'message': 'NOTAUTH', 'desc': 'Server not authoritative for the zone'})
-            elif status == 9:
-                reason.update({'message': 'NOTZONE', 'desc': 'Name not in zone'})
-            else:
-                reason.update({'message': 'UNKNOWN', 'desc': 'Unknown/unexpected status'})
-
-            return reason
+            return rcode_info(self.response.get('Status'))
 
         def block_info(self) -> dict:
             if self.doh_client.block_page_enabled:
@@ -137,9 +155,22 @@ class DOHClient:
         def authority(self) -> List[dict]:
             return self.response.get('Authority', [])
 
-    def __init__(self, connection: Connection, api_client, org_name: Optional[str] = None):
+        def result(self) -> LookupResult:
+            """Return a compact, immutable LookupResult that doesn't reference the client"""
+            return LookupResult.from_lookup(self)
+
+    def __init__(self, connection: Connection, api_client, org_name: Optional[str] = None,
+                 organizations: Optional[List[dict]] = None, hedging: Optional[HedgingPolicy] = None,
+                 verdict_index: Optional[VerdictIndex] = None):
         self.api_client = api_client
+        self.hedging = hedging
+        # Known verdicts that let lookup_many skip the DoH round trip
+        self.verdict_index = verdict_index
+        self._pool = None
+        self._pool_lock = threading.Lock()
         self.org_name = org_name or config('DEFAULT_ORG_NAME', default=None)
+        # An already-resolved organizations list (e.g. from FanOut) saves the account round trips
+        self._organizations = organizations
         self.client_id = self._get_client_id()
         self.connection = connection
         self._organization_settings = self._get_organization_settings()
@@ -150,9 +181,13 @@ class DOHClient:
     def __repr__(self) -> str:
         return self.__str__()
 
+    def _get_organizations(self) -> List[dict]:
+        if self._organizations is None:
+            return self.api_client.account().user().organizations().get('organizations', [])
+        return self._organizations
+
     def _get_client_id(self) -> str:
-        resp = self.api_client.account().user().organizations()
-        organizations = resp.get('organizations', [])
+        organizations = self._get_organizations()
 
         if not organizations:
             raise ValueError("No organizations found for this user.")
@@ -174,6 +209,11 @@ class DOHClient:
 
         return client_id
 
+    def _get(self, params: dict):
+        if self.hedging is None:
+            return self.connection.get('/', client_id=self.client_id, params=params)
+        return self.hedging.call(lambda: self.connection.get('/', client_id=self.client_id, params=params))
+
     @property
     def block_page_ip(self):
         return self._organization_settings.get('block_portal_ipv4', None)
@@ -184,7 +224,7 @@ class DOHClient:
 
     def _get_organization_settings(self) -> dict:
         try:
-            organizations = self.api_client.account().user().organizations().get('organizations', [])
+            organizations = self._get_organizations()
             for org in organizations:
                 if org.get('organization_name') == self.org_name:
                     settings = org.get('settings', {})
@@ -197,8 +237,54 @@ class DOHClient:
             print(f"An error occurred while trying to retrieve the organization settings: {e}")
         return {}
 
-    def lookup(self, ioc: str):
-        return self.Lookup(self, ioc)
+    def _submit(self, fn, *args):
+        # A shared pool for the concurrent record type queries of fetch_all
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=len(self.RECORD_TYPES) + 1)
+        return self._pool.submit(fn, *args)
+
+    def lookup(self, ioc: str, types: Optional[Iterable[str]] = None):
+        """
+        Look up an IOC.
+
+        :param ioc: The indicator of compromise.
+        :param types: (Optional) Record types (e.g. ['A', 'MX', 'TXT']) to fetch concurrently up front,
+                      instead of one query per record property on first access.
+        """
+        return self.Lookup(self, ioc, types)
+
+    def lookup_many(self, iocs: Iterable[str], max_workers: int = 8) -> Iterator[Tuple[str, str, object]]:
+        """
+        Look up many IOCs concurrently, streaming the results.
+
+        CIDR blocks (10.0.0.0/24) and address ranges (10.0.0.1-10.0.0.50) are expanded lazily 
+        into one PTR lookup per address.
+
+        If the client has a verdict_index, IOCs with a known verdict are answered locally.
+
+        :param iocs: An iterable of IOCs, consumed lazily.
+        :param max_workers: The number of concurrent lookups.
+        :return: A generator of (source, name, result) tuples in input order, where source is the
+                 IOC or block the name came from and result is a Lookup, a LookupResult when the
+                 verdict came from the verdict_index, or the exception the lookup raised.
+        """
+        return iter_lookups(self, iocs, max_workers)
+
+    def lookup_block(self, block: str, max_workers: int = 8) -> BlockSummary:
+        """
+        Run PTR lookups for every address in a CIDR block or range and summarize them.
+
+        :param block: A CIDR block or an address range, e.g. '192.0.2.0/24' or '192.0.2.10-192.0.2.20'.
+        :param max_workers: The number of concurrent lookups.
+        :return: A BlockSummary with the number of addresses, how many resolve, how many are blocked 
+                 and the distinct PTR targets.
+        """
+        return next(iter(summarize_blocks(self, [block], max_workers).values()))
+
+    def lookup_blocks(self, blocks: Iterable[str], max_workers: int = 8) -> Dict[str, BlockSummary]:
+        """Like lookup_block, for several blocks. Returns the summaries keyed by block."""
+        return summarize_blocks(self, blocks, max_workers)
 
     def setup(self, **kwargs):
         """
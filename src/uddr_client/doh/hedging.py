@@ -0,0 +1,178 @@
+import threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Optional
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class _Task:
+    """A query running on the policy's pool. Its clock starts when a worker picks it up."""
+    __slots__ = ('future', 'running', 'started')
+
+    def __init__(self):
+        self.future = None
+        self.running = threading.Event()
+        self.started = None
+
+
+class HedgingPolicy:
+    """
+    Hedge slow DoH queries by sending a duplicate request.
+
+    If a query hasn't answered within the given percentile of recently observed latency,
+    a second identical query is issued and whichever answers first is used. The other is
+    cancelled if it hasn't started, otherwise its answer is discarded. Hedges are capped by
+    a budget, the fraction of extra requests allowed over all queries.
+
+    Latencies are measured from the moment a request starts running, not from when it was
+    queued, so a backlog on the policy's own pool doesn't look like a slow resolver.
+    """
+
+    def __init__(self, percentile: float = 0.95, budget: float = 0.05, window: int = 1000,
+                 min_samples: int = 20, min_delay: float = 0.005, max_workers: int = 32):
+        """
+        :param percentile: The latency percentile (0-1) after which a hedge is sent. The default is 0.95.
+        :param budget: The maximum ratio of hedged to total queries. The default is 0.05 (5%).
+        :param window: The number of recent latencies the percentile is computed over.
+        :param min_samples: No hedges are sent until this many latencies have been observed.
+        :param min_delay: The lower bound, in seconds, on the hedge delay.
+        :param max_workers: The size of the thread pool the queries run on.
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("HedgingPolicy: percentile must be between 0 and 1")
+        if not 0 <= budget <= 1:
+            raise ValueError("HedgingPolicy: budget must be between 0 and 1")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)   # Latency of every individual request, feeds the delay
+        self._primary = deque(maxlen=window)     # Latency the primary request alone would have had
+        self._effective = deque(maxlen=window)   # Latency the caller actually saw
+        self._delay = None
+        self._stale = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        self.queries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _observe(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            # Re-sorting the window on every sample is wasteful, refresh the cached delay periodically
+            self._stale += 1
+            if self._delay is None or self._stale >= 32:
+                self._stale = 0
+                if len(self._latencies) >= self.min_samples:
+                    self._delay = max(self.min_delay, _percentile(self._latencies, self.percentile))
+
+    def delay(self) -> Optional[float]:
+        """The current hedge delay in seconds, or None while there aren't enough samples"""
+        return self._delay
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self._delay is None or self.hedges + 1 > self.budget * self.queries:
+                return False
+            self.hedges += 1
+            return True
+
+    def _submit(self, func: Callable[[], Any], record_primary: bool = False) -> _Task:
+        task = _Task()
+
+        def timed():
+            task.started = time.monotonic()
+            task.running.set()
+            result = func()
+            latency = time.monotonic() - task.started
+            self._observe(latency)
+            if record_primary:
+                with self._lock:
+                    self._primary.append(latency)
+            return result
+        task.future = self._executor.submit(timed)
+        return task
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Run func, hedging it with a second call if it is slow.
+
+        :param func: A callable performing the query. It may be called twice.
+        :return: The first result returned.
+        """
+        with self._lock:
+            self.queries += 1
+        delay = self._delay
+        task = self._submit(func, record_primary=True)
+        primary = task.future
+
+        if delay is None:
+            result = primary.result()
+        else:
+            # The hedge delay counts from when the primary starts running, not from the queue
+            task.running.wait()
+            done, _ = wait([primary], timeout=max(0.0, delay - (time.monotonic() - task.started)))
+            if done or not self._may_hedge():
+                result = primary.result()
+            else:
+                hedge = self._submit(func).future
+                pending = {primary, hedge}
+                result, error = None, None
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    winner = next((f for f in done if f.exception() is None), None)
+                    if winner is not None:
+                        if winner is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        for f in pending:
+                            f.cancel()
+                        result = winner.result()
+                        break
+                    error = next(iter(done)).exception()
+                else:
+                    raise error
+
+        with self._lock:
+            self._effective.append(time.monotonic() - task.started)
+        return result
+
+    def metrics(self) -> dict:
+        """
+        Summarize hedging activity.
+
+        p99_without_hedging is the p99 of the primary requests alone, p99 is what callers saw.
+        Both are measured from when the primary request started running.
+        """
+        with self._lock:
+            primary_p99 = _percentile(self._primary, 0.99)
+            effective_p99 = _percentile(self._effective, 0.99)
+            metrics = {
+                'queries': self.queries,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'hedge_ratio': self.hedges / self.queries if self.queries else 0.0,
+                'budget': self.budget,
+                'delay': self._delay,
+                'p50': _percentile(self._effective, 0.5),
+                'p99': effective_p99,
+                'p99_without_hedging': primary_p99,
+            }
+        if primary_p99 and effective_p99 is not None:
+            metrics['p99_reduction'] = 1 - effective_p99 / primary_p99
+        else:
+            metrics['p99_reduction'] = None
+        return metrics
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
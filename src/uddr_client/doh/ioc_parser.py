@@ -1,10 +1,34 @@
 import re
 import ipaddress
+from typing import Iterator, Optional, Tuple
+from ..profiling import timed
 
 class InvalidIOCError(Exception):
     pass
 
+def _refang(ioc: str) -> str:
+    ioc = ioc.strip().lower()
+    return re.sub(r'\[\.\]', '.', ioc)
+
+def _parse_netblock(ioc: str) -> Optional[Tuple[ipaddress._BaseAddress, ipaddress._BaseAddress]]:
+    """The first and last address of a refanged CIDR block or address range, None if it isn't one"""
+    try:
+        if '/' in ioc:
+            network = ipaddress.ip_network(ioc, strict=False)
+            return network.network_address, network.broadcast_address
+        if '-' in ioc:
+            first, last = ioc.split('-', 1)
+            return ipaddress.ip_address(first.strip()), ipaddress.ip_address(last.strip())
+    except ValueError:
+        pass
+    return None
+
+def ptr_name(ip) -> str:
+    """The in-addr.arpa / ip6.arpa name for an address"""
+    return ipaddress.ip_address(ip).reverse_pointer
+
 class IOCParser:
+    @timed('ioc_parse')
     def __init__(self, ioc: str):
         # Note: This logic is borrowed directly from the DDR-IOC-Checker
         # https://github.com/rybolov/DDR-IOC-Checker
@@ -13,28 +37,26 @@ class IOCParser:
         self.ioc = self.ioc.lower()  # Use all lower-case
         
         # Most CTI list domains as foo[.]com to keep you from clicking on them.
-        self.ioc = re.sub('\[\.\]', '.', self.ioc)
+        self.ioc = re.sub(r'\[\.\]', '.', self.ioc)
         
         # Remove "http://", "https://", "hxxp://" and "hxxps://"
+        is_url = re.match('^h[tx]{2}ps*://', self.ioc) is not None
         self.ioc = re.sub('^h[tx]{2}ps*://', '', self.ioc)
         
+        # A netblock would otherwise be truncated to its first address by the path removal below.
+        # URLs keep the path removal, so http://10.0.0.1/12 is still a lookup of 10.0.0.1.
+        if not is_url and _parse_netblock(self.ioc) is not None:
+            raise InvalidIOCError(f"'{self.ioc}' is a netblock, use NetblockParser or DOHClient.lookup_block")
+
         # Remove "/path/and/anything/else/here" and rely on regex being "greedy"
         self.ioc = re.sub('/.*$', '', self.ioc)
         
         if re.search('@', self.ioc):  # If the IOC is an email address
             self.ioc = re.sub('^.*@', '', self.ioc)
 
-        # If it's an IP address
+        # If it's an IP address, use the in-addr.arpa or ip6.arpa name
         try:
-            ip = ipaddress.ip_address(self.ioc)
-
-            if isinstance(ip, ipaddress.IPv4Address):  # If it's an IPv4 address
-                self.ioc = '.'.join(self.ioc.split('.')[::-1]) + '.in-addr.arpa'
-
-            elif isinstance(ip, ipaddress.IPv6Address):  # If it's an IPv6 address
-                self.ioc = ip.exploded.replace(':', '')
-                self.ioc = '.'.join(self.ioc[::-1]) + '.ip6.arpa'
-
+            self.ioc = ptr_name(self.ioc)
         except ValueError:  # It's not an IP address
             # If it's not a valid hostname either
             if not re.match(r'^([a-z0-9]([a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,}$', self.ioc):
@@ -43,5 +65,55 @@ class IOCParser:
     def __str__(self) -> str:
         return self.ioc
 
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class NetblockParser:
+    """
+    Parse a CIDR block (10.0.0.0/24, 2001:db8::/120) or an address range (10.0.0.1-10.0.0.50).
+
+    Iterating the parser yields the PTR name of every address in the block, one at a time,
+    so even large blocks are never held in memory.
+    """
+    def __init__(self, ioc: str, max_addresses: Optional[int] = 1 << 20):
+        """
+        :param ioc: The CIDR block or range.
+        :param max_addresses: (Optional) Reject blocks with more addresses than this. The default is 2^20.
+        """
+        self.ioc = _refang(ioc)
+        bounds = _parse_netblock(self.ioc)
+        if bounds is None or bounds[0].version != bounds[1].version or int(bounds[0]) > int(bounds[1]):
+            raise InvalidIOCError(f"'{self.ioc}' is not a valid CIDR block or address range")
+        first, last = bounds
+
+        self.version = first.version
+        self.first = int(first)
+        self.last = int(last)
+        if max_addresses is not None and self.size > max_addresses:
+            raise InvalidIOCError(f"'{self.ioc}' has {self.size} addresses, more than the limit of {max_addresses}")
+
+    @staticmethod
+    def is_netblock(ioc: str) -> bool:
+        return _parse_netblock(_refang(ioc)) is not None
+
+    @property
+    def size(self) -> int:
+        return self.last - self.first + 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def addresses(self) -> Iterator:
+        factory = ipaddress.IPv4Address if self.version == 4 else ipaddress.IPv6Address
+        for i in range(self.first, self.last + 1):
+            yield factory(i)
+
+    def __iter__(self) -> Iterator[str]:
+        for ip in self.addresses():
+            yield ip.reverse_pointer
+
+    def __str__(self) -> str:
+        return self.ioc
+
     def __repr__(self) -> str:
         return self.__str__()
\ No newline at end of file
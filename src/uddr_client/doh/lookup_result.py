@@ -0,0 +1,322 @@
+import json, sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from ..profiling import timed
+
+# DNS response codes, indexed by rcode
+RCODES = (
+    ('NOERROR', 'DNS Query received by server'),
+    ('FORMERR', 'DNS Query Format Error'),
+    ('SERVFAIL', 'Server failed to complete the DNS request'),
+    ('NXDOMAIN', 'Domain name does not exist'),
+    ('NOTIMP', 'Function not implemented'),
+    ('REFUSED', 'The server refused to answer for the query'),
+    ('YXDOMAIN', 'Name that should not exist, does exist'),
+    ('XRRSET', 'RRset that should not exist, does exist'),
+    ('NOTAUTH', 'Server not authoritative for the zone'),
+    ('NOTZONE', 'Name not in zone'),
+)
+RCODE_UNKNOWN = ('UNKNOWN', 'Unknown/unexpected status')
+NXDOMAIN = 3
+
+# DNS record type numbers for the types the client queries
+RECORD_TYPES = {
+    'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'PTR': 12, 'MX': 15, 'TXT': 16,
+    'AAAA': 28, 'SRV': 33, 'DS': 43, 'DNSKEY': 48, 'CAA': 257,
+}
+RECORD_NAMES = {number: name for name, number in RECORD_TYPES.items()}
+
+# Stored in the blocked column, which can't hold None
+_BLOCKED_UNKNOWN = -1
+
+
+def rcode_info(status: Optional[int]) -> dict:
+    """Expand a numerical DoH status into {'rcode', 'message', 'desc'}"""
+    if isinstance(status, int) and 0 <= status < len(RCODES):
+        message, desc = RCODES[status]
+    else:
+        message, desc = RCODE_UNKNOWN
+    return {'rcode': status, 'message': message, 'desc': desc}
+
+
+def record_type(value: Union[str, int]) -> int:
+    if isinstance(value, int):
+        return value
+    try:
+        return RECORD_TYPES[value.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown record type: {value}. Must be one of {sorted(RECORD_TYPES)}")
+
+
+class LookupResult:
+    """
+    A compact, immutable snapshot of a DoH lookup.
+
+    Unlike DOHClient.Lookup it holds no reference to the client or the raw response, only the
+    IOC, rcode, block verdict and the answers as (type, ttl, data) tuples.
+    """
+    __slots__ = ('ioc', 'qtype', 'rcode', 'blocked', 'answers')
+
+    def __init__(self, ioc: str, qtype: Optional[str], rcode: Optional[int],
+                 blocked: Optional[bool], answers: Tuple[Tuple[int, int, str], ...] = ()):
+        setter = object.__setattr__
+        setter(self, 'ioc', ioc)
+        setter(self, 'qtype', sys.intern(qtype) if qtype is not None else None)
+        setter(self, 'rcode', rcode)
+        setter(self, 'blocked', blocked)
+        setter(self, 'answers', tuple(answers))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LookupResult is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("LookupResult is immutable")
+
+    def __reduce__(self):
+        # Rebuild through __init__, the default protocol would trip the __setattr__ guard
+        return (LookupResult, (self.ioc, self.qtype, self.rcode, self.blocked, self.answers))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LookupResult):
+            return NotImplemented
+        return (self.ioc, self.qtype, self.rcode, self.blocked, self.answers) == \
+            (other.ioc, other.qtype, other.rcode, other.blocked, other.answers)
+
+    def __hash__(self) -> int:
+        return hash((self.ioc, self.qtype, self.rcode, self.blocked, self.answers))
+
+    def __repr__(self) -> str:
+        return f"LookupResult({self.ioc!r}, rcode={self.rcode}, blocked={self.blocked}, answers={len(self.answers)})"
+
+    @classmethod
+    def from_response(cls, ioc: str, data: dict, blocked: Optional[bool] = None,
+                      qtype: Optional[str] = None) -> 'LookupResult':
+        """Build a result from a decoded DoH JSON response"""
+        answers = tuple((a.get('type', 0), a.get('TTL', 0), a.get('data', ''))
+                        for a in data.get('Answer', []))
+        return cls(ioc, qtype, data.get('Status'), blocked, answers)
+
+    @classmethod
+    def from_lookup(cls, lookup) -> 'LookupResult':
+        """Build a result from a DOHClient.Lookup"""
+        return cls.from_response(lookup.ioc, lookup.response.raw(), lookup.blocked, lookup.type)
+
+    @property
+    def is_nxdomain(self) -> bool:
+        return self.rcode == NXDOMAIN
+
+    def status(self) -> dict:
+        return rcode_info(self.rcode)
+
+    def answer(self) -> List[dict]:
+        """The answers in the DoH JSON shape"""
+        return [{'name': self.ioc, 'type': t, 'TTL': ttl, 'data': data} for t, ttl, data in self.answers]
+
+    def records(self, rtype: Union[str, int]) -> List[str]:
+        """The answer data of one record type"""
+        number = record_type(rtype)
+        return [data for t, _, data in self.answers if t == number]
+
+    def to_dict(self) -> dict:
+        return {'ioc': self.ioc, 'type': self.qtype, 'rcode': self.rcode,
+                'blocked': self.blocked, 'answers': self.answer()}
+
+
+class LookupBatch:
+    """
+    A columnar container of lookup results.
+
+    Scalar fields are kept in typed arrays and answers are flattened into parallel columns
+    with per-row offsets, so a large batch costs a few bytes per row plus the strings.
+    Filters build numpy boolean masks over the columns and gather the selected rows with
+    fancy indexing. Only the two string columns (IOCs and answer data) are gathered in Python.
+    """
+
+    def __init__(self, results: Iterable[LookupResult] = ()):
+        self.iocs = []
+        self.qtypes = []
+        self.rcodes = array('h')
+        self.blocked_flags = array('b')
+        self.answer_offsets = array('L', [0])
+        self.answer_types = array('H')
+        self.answer_ttls = array('L')
+        self.answer_data = []
+        self.extend(results)
+
+    def __len__(self) -> int:
+        return len(self.iocs)
+
+    def __iter__(self) -> Iterator[LookupResult]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> LookupResult:
+        start, end = self.answer_offsets[i], self.answer_offsets[i + 1]
+        answers = tuple(zip(self.answer_types[start:end], self.answer_ttls[start:end], self.answer_data[start:end]))
+        flag = self.blocked_flags[i]
+        rcode = self.rcodes[i]
+        return LookupResult(self.iocs[i], self.qtypes[i], None if rcode < 0 else rcode,
+                            None if flag == _BLOCKED_UNKNOWN else bool(flag), answers)
+
+    def __repr__(self) -> str:
+        return f"LookupBatch({len(self)} results)"
+
+    def append(self, result) -> None:
+        """Append a LookupResult or a DOHClient.Lookup"""
+        if not isinstance(result, LookupResult):
+            result = LookupResult.from_lookup(result)
+        self.iocs.append(result.ioc)
+        self.qtypes.append(result.qtype)
+        self.rcodes.append(-1 if result.rcode is None else result.rcode)
+        self.blocked_flags.append(_BLOCKED_UNKNOWN if result.blocked is None else int(result.blocked))
+        for t, ttl, data in result.answers:
+            self.answer_types.append(t)
+            self.answer_ttls.append(ttl)
+            self.answer_data.append(sys.intern(data))
+        self.answer_offsets.append(len(self.answer_data))
+
+    def extend(self, results: Iterable) -> None:
+        for result in results:
+            self.append(result)
+
+    # Filters
+
+    def _columns(self):
+        """numpy copies of the typed columns. Views would pin the arrays and block append()."""
+        import numpy as np
+        def column(values):
+            return np.frombuffer(values.tobytes(), dtype=values.typecode)
+        # Offsets are used in index arithmetic, which numpy refuses on uint64
+        return (column(self.rcodes), column(self.blocked_flags), column(self.answer_offsets).astype(np.int64),
+                column(self.answer_types))
+
+    def select(self, mask) -> 'LookupBatch':
+        """Return a new batch with the rows where mask (a boolean numpy array or iterable) is true"""
+        import numpy as np
+        mask = np.asarray(mask if hasattr(mask, '__len__') else list(mask), dtype=bool)
+        if len(mask) != len(self):
+            raise ValueError(f"select: mask has {len(mask)} entries for {len(self)} rows")
+        rows = np.flatnonzero(mask)
+        rcodes, flags, offsets, types = self._columns()
+
+        # The answer positions of the selected rows, as one gather index
+        starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+        new_offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        answers = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+
+        batch = LookupBatch()
+        row_list = rows.tolist()
+        batch.iocs = list(map(self.iocs.__getitem__, row_list))
+        batch.qtypes = list(map(self.qtypes.__getitem__, row_list))
+        batch.rcodes.frombytes(rcodes[rows].tobytes())
+        batch.blocked_flags.frombytes(flags[rows].tobytes())
+        batch.answer_offsets = array(self.answer_offsets.typecode, new_offsets.astype(self.answer_offsets.typecode).tobytes())
+        batch.answer_types.frombytes(types[answers].tobytes())
+        batch.answer_ttls.frombytes(np.frombuffer(self.answer_ttls.tobytes(), dtype=self.answer_ttls.typecode)[answers].tobytes())
+        batch.answer_data = list(map(self.answer_data.__getitem__, answers.tolist()))
+        return batch
+
+    def blocked(self) -> 'LookupBatch':
+        return self.select(self._columns()[1] == 1)
+
+    def not_blocked(self) -> 'LookupBatch':
+        return self.select(self._columns()[1] == 0)
+
+    def nxdomain(self) -> 'LookupBatch':
+        return self.by_rcode(NXDOMAIN)
+
+    def by_rcode(self, rcode: Union[int, str]) -> 'LookupBatch':
+        if isinstance(rcode, str):
+            names = [message for message, _ in RCODES]
+            if rcode.upper() not in names:
+                raise ValueError(f"Unknown rcode: {rcode}. Must be one of {names}")
+            rcode = names.index(rcode.upper())
+        return self.select(self._columns()[0] == rcode)
+
+    def by_type(self, rtype: Union[str, int]) -> 'LookupBatch':
+        """Rows with at least one answer of the given record type"""
+        import numpy as np
+        number = record_type(rtype)
+        _, _, offsets, types = self._columns()
+        # Map each matching answer back to its row
+        owners = np.repeat(np.arange(len(self)), np.diff(offsets))
+        mask = np.zeros(len(self), dtype=bool)
+        mask[owners[types == number]] = True
+        return self.select(mask)
+
+    # Export
+
+    def counts(self) -> dict:
+        """The number of rows per rcode message and per block verdict"""
+        import numpy as np
+        rcodes = {}
+        values, totals = np.unique(self._columns()[0], return_counts=True)
+        for r, total in zip(values.tolist(), totals.tolist()):
+            message = RCODES[r][0] if 0 <= r < len(RCODES) else RCODE_UNKNOWN[0]
+            rcodes[message] = rcodes.get(message, 0) + total
+        return {
+            'total': len(self),
+            'blocked': self.blocked_flags.count(1),
+            'not_blocked': self.blocked_flags.count(0),
+            'unknown': self.blocked_flags.count(_BLOCKED_UNKNOWN),
+            'rcodes': rcodes,
+        }
+
+    def to_records(self) -> List[dict]:
+        return [result.to_dict() for result in self]
+
+    def to_ndjson(self, fp) -> None:
+        """Write one JSON object per row to a text file object"""
+        for result in self:
+            fp.write(json.dumps(result.to_dict()) + '\n')
+
+    @timed('to_dataframe')
+    def to_dataframe(self):
+        """One row per lookup with the answers joined by type, e.g. the 'A' column holds 'ip1,ip2'"""
+        import pandas as pd
+
+        columns = {}
+        for i in range(len(self)):
+            start, end = self.answer_offsets[i], self.answer_offsets[i + 1]
+            for t, data in zip(self.answer_types[start:end], self.answer_data[start:end]):
+                name = RECORD_NAMES.get(t, str(t))
+                columns.setdefault(name, {}).setdefault(i, []).append(data)
+
+        df = pd.DataFrame({
+            'ioc': self.iocs,
+            'rcode': pd.array([None if r < 0 else r for r in self.rcodes], dtype='Int16'),
+            'blocked': pd.array([None if f == _BLOCKED_UNKNOWN else bool(f) for f in self.blocked_flags], dtype='boolean'),
+        })
+        for name, rows in columns.items():
+            df[name] = pd.Series({i: ','.join(values) for i, values in rows.items()}, index=df.index, dtype='object')
+        return df
+
+
+class Profile:
+    """The answers of several record types for one name, as returned by Lookup.fetch_all()."""
+    __slots__ = ('ioc', 'blocked', 'records', 'statuses')
+
+    def __init__(self, ioc: str, blocked: Optional[bool], records: dict, statuses: dict):
+        self.ioc = ioc
+        self.blocked = blocked
+        self.records = records    # {record type: [answer dicts]}
+        self.statuses = statuses  # {record type: rcode}
+
+    def __getitem__(self, record_type: str) -> List[dict]:
+        return self.records[record_type.upper()]
+
+    def __repr__(self) -> str:
+        counts = ', '.join(f"{t}={len(answers)}" for t, answers in self.records.items())
+        return f"Profile({self.ioc!r}, {counts})"
+
+    def data(self, record_type: str) -> List[str]:
+        """The answer data of one record type"""
+        return [a.get('data') for a in self[record_type]]
+
+    def to_dict(self) -> dict:
+        return {
+            'ioc': self.ioc,
+            'blocked': self.blocked,
+            'records': {t: [a.get('data') for a in answers] for t, answers in self.records.items()},
+            'status': {t: rcode_info(rcode)['message'] for t, rcode in self.statuses.items()},
+        }
@@ -0,0 +1,240 @@
+import heapq, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TextIO, Tuple
+
+
+class ChangeEvent:
+    """A change in an IOC's verdict between two checks."""
+    __slots__ = ('ioc', 'timestamp', 'changes')
+
+    def __init__(self, ioc: str, timestamp: float, changes: dict):
+        self.ioc = ioc
+        self.timestamp = timestamp
+        self.changes = changes  # {field: {'old': ..., 'new': ...}}
+
+    def to_dict(self) -> dict:
+        return {'ioc': self.ioc, 'timestamp': self.timestamp, 'changes': self.changes}
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.ioc!r}, {sorted(self.changes)})"
+
+
+class NDJSONSink:
+    """A change event callback that appends each event as a JSON line to a file."""
+
+    def __init__(self, fp: TextIO):
+        self.fp = fp
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ChangeEvent):
+        with self._lock:
+            self.fp.write(json.dumps(event.to_dict()) + '\n')
+            self.fp.flush()
+
+
+def _snapshot(lookup) -> dict:
+    """The parts of a lookup that are compared between checks"""
+    return {
+        'block_info': lookup.block_info(),
+        'status': lookup.status(),
+        'answers': sorted(a.get('data') for a in _records(lookup)),
+    }
+
+
+def _records(lookup) -> List[dict]:
+    # PTR lookups are compared on their own answer, everything else on its A records
+    return lookup.answer() if lookup.type is not None else lookup.A
+
+
+def _min_ttl(lookup, default: int) -> int:
+    ttls = [a.get('TTL') for a in _records(lookup) if a.get('TTL') is not None]
+    if not ttls:
+        # NXDOMAIN and other empty answers carry their negative-caching TTL in the SOA
+        ttls = [a.get('TTL') for a in lookup.authority() if a.get('TTL') is not None]
+    return min(ttls) if ttls else default
+
+
+class WatchlistMonitor:
+    """
+    Watch a list of IOCs and report when their UDDR verdict changes.
+
+    Every IOC is kept in a priority queue ordered by its next due time, which is derived from
+    the TTL of its last answer (clamped to min_interval/max_interval). Only the IOCs that are
+    due are re-checked, at most `rate` lookups per second overall. When the block verdict,
+    status or A records of an IOC differ from its previous check, a ChangeEvent is passed to
+    the callback.
+    """
+
+    def __init__(self, doh_client, iocs: Iterable[str], callback: Callable[[ChangeEvent], None],
+                 rate: float = 50.0, max_workers: int = 8,
+                 min_interval: int = 60, max_interval: int = 86400, default_interval: int = 3600):
+        """
+        :param doh_client: The DOHClient used for lookups.
+        :param iocs: The watchlist.
+        :param callback: Called with a ChangeEvent for every change, e.g. an NDJSONSink. Exceptions it
+                         raises are counted in callback_errors (and kept in last_error), not propagated.
+        :param rate: The global budget in lookups per second.
+        :param max_workers: The number of concurrent lookups.
+        :param min_interval: The minimum seconds between checks of one IOC.
+        :param max_interval: The maximum seconds between checks of one IOC.
+        :param default_interval: The interval used when an answer has no TTL or the lookup fails.
+        """
+        if rate <= 0:
+            raise ValueError("WatchlistMonitor: rate must be positive")
+        self.doh_client = doh_client
+        self.callback = callback
+        self.rate = rate
+        self.max_workers = max(1, max_workers)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+
+        self._state = {}
+        # Queue entries are (due, generation, ioc). An IOC's generation changes when it is
+        # re-added, so entries left over from before a remove() are recognised and dropped.
+        self._queue = []
+        self._generations = {}
+        self._next_generation = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.checks = 0
+        self.errors = 0
+        self.callback_errors = 0
+        self.last_error = None
+        for ioc in iocs:
+            self.add(ioc)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def add(self, ioc: str, due: Optional[float] = None):
+        """Add an IOC to the watchlist, due immediately unless a due time is given"""
+        with self._lock:
+            if ioc not in self._state:
+                self._state[ioc] = None
+                self._next_generation += 1
+                self._generations[ioc] = self._next_generation
+                heapq.heappush(self._queue, (time.time() if due is None else due, self._next_generation, ioc))
+
+    def remove(self, ioc: str):
+        """Remove an IOC. Its queue entry is discarded when it comes due."""
+        with self._lock:
+            self._state.pop(ioc, None)
+            self._generations.pop(ioc, None)
+
+    def _interval(self, lookup) -> int:
+        ttl = _min_ttl(lookup, self.default_interval)
+        return max(self.min_interval, min(self.max_interval, ttl))
+
+    def _check(self, ioc: str) -> float:
+        """Look up one IOC, emit an event if it changed, and return its next due time"""
+        try:
+            lookup = self.doh_client.lookup(ioc)
+            current = _snapshot(lookup)
+            interval = self._interval(lookup)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return time.time() + self.default_interval
+
+        with self._lock:
+            self.checks += 1
+            if ioc not in self._state:
+                return None
+            previous = self._state[ioc]
+            self._state[ioc] = current
+
+        if previous is not None:
+            changes = {field: {'old': previous[field], 'new': current[field]}
+                       for field in current if previous[field] != current[field]}
+            if changes:
+                try:
+                    self.callback(ChangeEvent(ioc, time.time(), changes))
+                except Exception as e:
+                    # A failing sink (full disk, closed pipe) must not stop the monitor
+                    with self._lock:
+                        self.callback_errors += 1
+                        self.last_error = e
+        return time.time() + interval
+
+    def _due(self, now: float, limit: int) -> List[Tuple[str, int]]:
+        """Pop up to limit due (ioc, generation) pairs, skipping stale entries"""
+        due = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now and len(due) < limit:
+                _, generation, ioc = heapq.heappop(self._queue)
+                if self._generations.get(ioc) == generation:
+                    due.append((ioc, generation))
+        return due
+
+    def run_once(self, executor: Optional[ThreadPoolExecutor] = None) -> int:
+        """
+        Check the IOCs that are due, honouring the rate budget.
+
+        :return: The number of IOCs checked.
+        """
+        started = time.monotonic()
+        batch = self._due(time.time(), max(1, int(self.rate)))
+        if not batch:
+            return 0
+
+        own = executor is None
+        if own:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [(ioc, generation, executor.submit(self._check, ioc)) for ioc, generation in batch]
+            for ioc, generation, future in futures:
+                try:
+                    next_due = future.result()
+                except Exception as e:
+                    # Every popped IOC is rescheduled, even if its check failed unexpectedly
+                    with self._lock:
+                        self.errors += 1
+                        self.last_error = e
+                    next_due = time.time() + self.default_interval
+                with self._lock:
+                    # Not if it was removed (and maybe re-added) during the check
+                    if next_due is not None and self._generations.get(ioc) == generation:
+                        heapq.heappush(self._queue, (next_due, generation, ioc))
+        finally:
+            if own:
+                executor.shutdown()
+
+        # Spread the budget: a batch of `rate` lookups takes at least one second
+        remaining = len(batch) / self.rate - (time.monotonic() - started)
+        if remaining > 0:
+            self._stop.wait(remaining)
+        return len(batch)
+
+    def run(self):
+        """Monitor until stop() is called"""
+        self._stop.clear()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stop.is_set():
+                try:
+                    checked = self.run_once(executor)
+                except Exception as e:
+                    # Keep the background thread alive through one bad iteration
+                    with self._lock:
+                        self.errors += 1
+                        self.last_error = e
+                    self._stop.wait(1.0)
+                    continue
+                if checked == 0:
+                    with self._lock:
+                        next_due = self._queue[0][0] if self._queue else None
+                    wait = 1.0 if next_due is None else min(1.0, max(0.0, next_due - time.time()))
+                    self._stop.wait(wait)
+
+    def start(self) -> 'WatchlistMonitor':
+        """Run the monitor in a background daemon thread"""
+        self._thread = threading.Thread(target=self.run, name='uddr-watchlist-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,173 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from ..response import Response
+from .ioc_parser import IOCParser, InvalidIOCError
+
+# Trie node key holding the verdict of the name ending at that node
+_VERDICT = ''
+
+
+def _truthy(value) -> bool:
+    # Exports may carry the blocked flag as a bool, a number or a string
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+class VerdictIndex:
+    """
+    A local index of known block verdicts, used to answer lookups without a DoH round trip.
+
+    Domains are stored in a trie keyed by their labels in reverse order (com -> example -> www),
+    so an exact name and all of its parent domains are checked in one walk. A blocked entry
+    added with subdomains=True also matches every name below it.
+
+    Only blocked verdicts learned from lookups are kept by default, since a name that is clean
+    today may be blocked tomorrow. Not-blocked entries come from add(), load() or cache_negative.
+    """
+
+    def __init__(self, cache_negative: bool = False):
+        """
+        :param cache_negative: Also keep not-blocked verdicts learned through add_lookup(), so those
+                               names are never looked up again. The default is False.
+        """
+        self._root = {}
+        self._size = 0
+        self.cache_negative = cache_negative
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _normalize(ioc: str) -> Optional[str]:
+        try:
+            return str(IOCParser(ioc))
+        except InvalidIOCError:
+            return None
+
+    def add(self, domain: str, blocked: bool = True, subdomains: bool = True):
+        """
+        Record a verdict.
+
+        :param domain: The domain (or any IOC accepted by IOCParser).
+        :param blocked: The verdict. The default is True.
+        :param subdomains: If the domain is blocked, whether names below it are blocked too.
+        """
+        name = self._normalize(domain)
+        if name is None:
+            raise InvalidIOCError(f"'{domain}' is not a valid IP address or hostname")
+        node = self._root
+        for label in reversed(name.split('.')):
+            node = node.setdefault(label, {})
+        if _VERDICT not in node:
+            self._size += 1
+        node[_VERDICT] = (bool(blocked), bool(blocked and subdomains))
+
+    def match(self, ioc: str) -> Optional[bool]:
+        """
+        The known verdict for an IOC: True if blocked (exactly or through a blocked parent
+        domain), False if known not blocked, None if unknown.
+        """
+        name = self._normalize(ioc)
+        if name is None:
+            return None
+        node = self._root
+        for label in reversed(name.split('.')):
+            node = node.get(label)
+            if node is None:
+                return None
+            verdict = node.get(_VERDICT)
+            if verdict is not None and verdict[1]:
+                return True
+        verdict = node.get(_VERDICT)
+        return verdict[0] if verdict is not None else None
+
+    def __contains__(self, ioc: str) -> bool:
+        return self.match(ioc) is not None
+
+    def match_many(self, iocs: Iterable[str]) -> Dict[str, Optional[bool]]:
+        """The verdict of every IOC, as {ioc: True/False/None}"""
+        return {ioc: self.match(ioc) for ioc in iocs}
+
+    def partition(self, iocs: Iterable[str]) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Split IOCs into those answered locally and those that still need a lookup.
+
+        :return: ({ioc: verdict} for known IOCs, [unknown IOCs])
+        """
+        known, unknown = {}, []
+        for ioc in iocs:
+            verdict = self.match(ioc)
+            if verdict is None:
+                unknown.append(ioc)
+            else:
+                known[ioc] = verdict
+        return known, unknown
+
+    # Seeding
+
+    def add_logs(self, logs: Union[Response, dict, List[dict]], field: str = 'domain',
+                 blocked_field: str = 'blocked') -> int:
+        """
+        Add the domains of blocked log records as blocked, exact names only (subdomains=False).
+
+        Records whose blocked_field says the query wasn't blocked are skipped. Records without
+        the field are taken as blocked, e.g. the results of a logs() query for blocked queries.
+
+        :param logs: A logs() Response, its raw data or a list of log records.
+        :param field: The record field holding the queried name.
+        :param blocked_field: The record field holding whether the query was blocked.
+        :return: The number of domains added.
+        """
+        if isinstance(logs, Response):
+            logs = logs.raw()
+        if isinstance(logs, dict):
+            logs = logs.get('logs', [])
+        added = 0
+        for record in logs:
+            if blocked_field in record and not _truthy(record[blocked_field]):
+                continue
+            domain = record.get(field)
+            if domain and self._normalize(domain) is not None:
+                self.add(domain, blocked=True, subdomains=False)
+                added += 1
+        return added
+
+    def add_lookup(self, lookup):
+        """Add the verdict of a DOHClient.Lookup or LookupResult if blocked, or if not blocked and cache_negative is set"""
+        if lookup.blocked or (lookup.blocked is False and self.cache_negative):
+            self.add(lookup.ioc, blocked=lookup.blocked, subdomains=False)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'VerdictIndex':
+        """
+        Load an index from a text file with one entry per line: domain[,blocked[,subdomains]],
+        where blocked and subdomains are 1/0 (both default to 1). Lines starting with # are skipped.
+        """
+        index = cls(**kwargs)
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = [p.strip() for p in line.split(',')]
+                blocked = parts[1] != '0' if len(parts) > 1 else True
+                subdomains = parts[2] != '0' if len(parts) > 2 else True
+                index.add(parts[0], blocked, subdomains)
+        return index
+
+    def save(self, path: str):
+        """Write the index in the format read by load()"""
+        with open(path, 'w') as f:
+            for name, (blocked, subdomains) in self.items():
+                f.write(f"{name},{int(blocked)},{int(subdomains)}\n")
+
+    def items(self):
+        """Yield (name, (blocked, subdomains)) for every entry"""
+        stack = [((), self._root)]
+        while stack:
+            labels, node = stack.pop()
+            for label, child in node.items():
+                if label == _VERDICT:
+                    yield '.'.join(reversed(labels)), child
+                else:
+                    stack.append((labels + (label,), child))
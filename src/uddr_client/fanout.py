@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .connection import Connection
+from .doh import DOHClient
+from .api import APIClient
+
+
+class FanOutResult(dict):
+    """Results keyed by organization name. Organizations whose call raised are listed in errors."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class FanOut:
+    """
+    Run the same DoH lookup or API query across several organizations concurrently.
+
+    The organization list is resolved once from account().user().organizations() and each
+    organization gets its own DOHClient bound to its client_id. Calls run on a shared thread
+    pool (max_workers) with at most max_per_org calls in flight for any one organization.
+    Lookups and API calls run on a strict connection, so HTTP error statuses are reported in
+    errors rather than returned as results.
+    """
+
+    def __init__(self, connection: Connection, api_client: APIClient,
+                 org_names: Optional[Iterable[str]] = None,
+                 max_workers: int = 16, max_per_org: int = 4):
+        """
+        :param connection: The connection used for DoH lookups.
+        :param api_client: The API client used to resolve the organizations.
+        :param org_names: (Optional) Restrict the fan-out to these organization names. The default is all.
+        :param max_workers: The total number of concurrent calls.
+        :param max_per_org: The maximum number of concurrent calls per organization.
+        """
+        self.connection = connection.strict()
+        self.api_client = api_client
+        self.max_workers = max(1, max_workers)
+        self.max_per_org = max(1, max_per_org)
+
+        self.all_organizations = api_client.account().user().organizations().get('organizations', [])
+        if not self.all_organizations:
+            raise ValueError("No organizations found for this user.")
+
+        if org_names is None:
+            self.organizations = list(self.all_organizations)
+        else:
+            wanted = set(org_names)
+            known = {org.get('organization_name') for org in self.all_organizations}
+            unknown = wanted - known
+            if unknown:
+                raise ValueError(f"Unknown organization name(s): {sorted(unknown)}. Must be one of {sorted(known)}")
+            self.organizations = [org for org in self.all_organizations if org.get('organization_name') in wanted]
+
+        self._limits = {org.get('organization_name'): threading.Semaphore(self.max_per_org)
+                        for org in self.organizations}
+        self._doh_clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def org_names(self) -> List[str]:
+        return [org.get('organization_name') for org in self.organizations]
+
+    @property
+    def client_ids(self) -> Dict[str, str]:
+        return {org.get('organization_name'): org.get('client_id') for org in self.organizations}
+
+    def doh(self, org_name: str) -> DOHClient:
+        """Get (or build) the DOHClient bound to an organization, without extra account calls"""
+        with self._lock:
+            if org_name not in self._doh_clients:
+                self._doh_clients[org_name] = DOHClient(self.connection, self.api_client, org_name,
+                                                        organizations=self.all_organizations)
+            return self._doh_clients[org_name]
+
+    def _run(self, tasks: List[tuple]) -> List[tuple]:
+        """Run (org_name, key, func) tasks and return (org_name, key, result, error) tuples"""
+        def call(org_name, key, func):
+            with self._limits[org_name]:
+                try:
+                    return org_name, key, func(), None
+                except Exception as e:
+                    return org_name, key, None, e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(call, *task) for task in tasks]
+            return [f.result() for f in futures]
+
+    def map(self, func: Callable[[dict], Any]) -> FanOutResult:
+        """
+        Call func(organization) for every selected organization concurrently.
+
+        :param func: A callable receiving the organization dict (organization_name, client_id, settings, ...).
+                     Use self.doh() or self.connection inside it so HTTP error statuses raise.
+        :return: A FanOutResult keyed by organization name.
+        """
+        tasks = [(org.get('organization_name'), None, (lambda org=org: func(org))) for org in self.organizations]
+        result = FanOutResult()
+        for org_name, _, value, error in self._run(tasks):
+            if error is not None:
+                result.errors[org_name] = error
+            else:
+                result[org_name] = value
+        return result
+
+    def lookup(self, ioc: str) -> FanOutResult:
+        """
+        Look up one IOC against every selected organization's resolver.
+
+        :param ioc: The indicator of compromise.
+        :return: A FanOutResult of {organization_name: Lookup}.
+        """
+        return self.map(lambda org: self.doh(org.get('organization_name')).lookup(ioc))
+
+    def lookup_many(self, iocs: Iterable[str]) -> FanOutResult:
+        """
+        Look up several IOCs against every selected organization's resolver.
+
+        :param iocs: The indicators of compromise.
+        :return: A FanOutResult of {organization_name: {ioc: Lookup}}. Errors are keyed the same way.
+        """
+        iocs = list(iocs)
+        # Interleave organizations so pool workers aren't all parked on one organization's limit
+        tasks = []
+        for ioc in iocs:
+            for org_name in self.org_names:
+                tasks.append((org_name, ioc, (lambda org_name=org_name, ioc=ioc: self.doh(org_name).lookup(ioc))))
+
+        result = FanOutResult({org_name: {} for org_name in self.org_names})
+        for org_name, ioc, value, error in self._run(tasks):
+            if error is not None:
+                result.errors.setdefault(org_name, {})[ioc] = error
+            else:
+                result[org_name][ioc] = value
+        return result
+
+    def api(self, method: str, *args, api_keys: Dict[str, str], **kwargs) -> FanOutResult:
+        """
+        Call an APIClient method for every selected organization concurrently.
+
+        The API scopes every call to the organization its API key belongs to, so a key is
+        needed per organization. Organizations without a key are reported in errors.
+
+        :param method: The APIClient method name, e.g. 'logs' or 'summary'.
+        :param args: Positional arguments for the method.
+        :param api_keys: A mapping of organization name to that organization's API key.
+        :param kwargs: Keyword arguments for the method.
+        :return: A FanOutResult of {organization_name: Response}.
+        """
+        if not hasattr(APIClient, method):
+            raise ValueError(f"APIClient has no method '{method}'")
+
+        def call(org):
+            org_name = org.get('organization_name')
+            if org_name not in api_keys:
+                raise ValueError(f"No API key provided for organization '{org_name}'")
+            # Share the pooled session (or recording/replay transport) across the per-organization keys
+            connection = Connection(api_keys[org_name], transport=self.connection.session, raise_for_status=True)
+            return getattr(APIClient(connection), method)(*args, **kwargs)
+
+        return self.map(call)
@@ -0,0 +1,301 @@
+"""
+Opt-in profiling of where a run spends its time.
+
+    from uddr_client.profiling import Profiler, SamplingProfiler
+
+    with Profiler() as profiler:
+        ...  # any client calls
+    profiler.print_report()
+
+While a Profiler is active the client times its phases (IOC parsing, network, JSON decoding,
+pandas export through Response.csv() and to_dataframe()) per operation and endpoint. When
+none is active each instrumented call costs one global lookup. SamplingProfiler finds hot
+paths in any block of code without instrumenting it.
+"""
+import csv, functools, json, random, sys, threading, time
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, TextIO, Tuple
+
+# The active Profiler, if any. Instrumented code checks it before doing any timing work.
+_active = None
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'key', 'started')
+
+    def __init__(self, profiler: 'Profiler', key: Tuple[str, str]):
+        self.profiler = profiler
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.key[0], self.key[1], time.perf_counter() - self.started)
+        return False
+
+
+def phase(operation: str, endpoint: str = '-'):
+    """A context manager timing a block as operation/endpoint, a no-op when profiling is off"""
+    profiler = _active
+    if profiler is None:
+        return _NULL_PHASE
+    return _Phase(profiler, (operation, endpoint))
+
+
+def timed(operation: str):
+    """Decorate a function so every call is timed as operation while profiling is on"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(operation, '-', time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class _Stat:
+    __slots__ = ('calls', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = array('d')
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Profiler:
+    """
+    Per-phase timing counters, aggregated by (operation, endpoint).
+
+    Only one Profiler is active at a time; enable() replaces the active one. Durations are kept
+    exactly for count/total/max and as a bounded reservoir sample for the percentiles.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        :param max_samples: The reservoir size per operation/endpoint used for percentiles.
+        """
+        self.max_samples = max_samples
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._started = None
+        self._stopped = None
+
+    def enable(self) -> 'Profiler':
+        global _active
+        self._started = time.perf_counter()
+        self._stopped = None
+        _active = self
+        return self
+
+    def disable(self):
+        global _active
+        if _active is self:
+            _active = None
+        self._stopped = time.perf_counter()
+
+    def __enter__(self) -> 'Profiler':
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+        self._started = time.perf_counter()
+
+    def record(self, operation: str, endpoint: str, seconds: float):
+        with self._lock:
+            stat = self._stats.get((operation, endpoint))
+            if stat is None:
+                stat = self._stats[(operation, endpoint)] = _Stat()
+            stat.calls += 1
+            stat.total += seconds
+            if seconds > stat.max:
+                stat.max = seconds
+            if len(stat.samples) < self.max_samples:
+                stat.samples.append(seconds)
+            else:
+                slot = random.randrange(stat.calls)
+                if slot < self.max_samples:
+                    stat.samples[slot] = seconds
+
+    @property
+    def elapsed(self) -> float:
+        """The wall time the profiler has been (or was) enabled for"""
+        if self._started is None:
+            return 0.0
+        return (self._stopped or time.perf_counter()) - self._started
+
+    def report(self) -> List[Dict]:
+        """
+        One row per operation/endpoint, slowest total first.
+
+        Times are in seconds; rate is calls per second of wall time while profiling.
+        """
+        elapsed = self.elapsed
+        rows = []
+        with self._lock:
+            items = [(key, stat.calls, stat.total, stat.max, sorted(stat.samples))
+                     for key, stat in self._stats.items()]
+        for (operation, endpoint), calls, total, longest, ordered in items:
+            rows.append({
+                'operation': operation,
+                'endpoint': endpoint,
+                'calls': calls,
+                'total': total,
+                'mean': total / calls,
+                'p50': _percentile(ordered, 0.50),
+                'p95': _percentile(ordered, 0.95),
+                'p99': _percentile(ordered, 0.99),
+                'max': longest,
+                'rate': calls / elapsed if elapsed else 0.0,
+            })
+        rows.sort(key=lambda row: row['total'], reverse=True)
+        return rows
+
+    def print_report(self, stream: TextIO = sys.stderr):
+        """Print the report as a table, with times in milliseconds"""
+        rows = self.report()
+        stream.write(f"Profile: {self.elapsed:.3f}s wall time\n")
+        header = ('operation', 'endpoint', 'calls', 'total ms', 'mean ms', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'calls/s')
+        lines = [header]
+        for row in rows:
+            lines.append((row['operation'], row['endpoint'], str(row['calls']),
+                          *(f"{row[k] * 1000:.2f}" for k in ('total', 'mean', 'p50', 'p95', 'p99', 'max')),
+                          f"{row['rate']:.1f}"))
+        widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+        for line in lines:
+            cells = [cell.ljust(widths[i]) if i < 2 else cell.rjust(widths[i]) for i, cell in enumerate(line)]
+            stream.write('  '.join(cells).rstrip() + '\n')
+
+    def save(self, path: str):
+        """Write the report as .csv, or as JSON for any other extension"""
+        rows = self.report()
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['operation'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump({'elapsed': self.elapsed, 'phases': rows}, f, indent=2)
+
+
+class SamplingProfiler:
+    """
+    A statistical profiler for a block of code.
+
+    A background thread snapshots the stacks of the other threads every interval and counts
+    the functions found, so hot paths show up without editing the library:
+
+        with SamplingProfiler() as sampler:
+            doh.lookup_blocks(['10.0.0.0/24'])
+        sampler.print_top()
+    """
+
+    def __init__(self, interval: float = 0.005, all_threads: bool = True):
+        """
+        :param interval: Seconds between samples.
+        :param all_threads: Sample every thread (e.g. the lookup workers), or only the one that
+                            started the profiler.
+        """
+        if interval <= 0:
+            raise ValueError("SamplingProfiler: interval must be positive")
+        self.interval = interval
+        self.all_threads = all_threads
+        self.samples = 0
+        self.own = Counter()         # Samples with the function on top of the stack
+        self.cumulative = Counter()  # Samples with the function anywhere on the stack
+        self.stacks = Counter()      # Collapsed stacks, root first
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (not self.all_threads and thread_id != self._target):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            if not stack:
+                continue
+            self.own[stack[0]] += 1
+            self.cumulative.update(set(stack))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'SamplingProfiler':
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='uddr-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def top(self, n: int = 20, cumulative: bool = False) -> List[Tuple[str, int]]:
+        """The n functions seen most often, as (function, samples)"""
+        return (self.cumulative if cumulative else self.own).most_common(n)
+
+    def print_top(self, n: int = 20, stream: TextIO = sys.stderr):
+        stream.write(f"{self.samples} samples every {self.interval * 1000:g}ms\n")
+        for title, counter in (('self', self.own), ('cumulative', self.cumulative)):
+            total = sum(self.own.values()) or 1
+            stream.write(f"-- top {n} by {title} samples --\n")
+            for label, count in counter.most_common(n):
+                stream.write(f"{count:8d} {100 * count / total:6.1f}%  {label}\n")
+
+    def save_collapsed(self, path: str):
+        """Write the stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
@@ -1,7 +1,65 @@
 import json
-import pandas as pd
-import xmltodict as xmltd
-from typing import Any, Union, List
+from typing import Any, Iterable, Optional, Union, List
+from .profiling import timed
+
+# Sections that hold the tabular part of a response, in the order csv() checks them
+SECTIONS = ('top_items', 'logs', 'reports', 'aggregates')
+
+# Columns holding timestamps, besides any whose name contains 'date' or 'time'
+DATETIME_COLUMNS = {'key', 'previous_key'}
+
+# The range integer columns are narrowed to (int32)
+COUNT_MIN, COUNT_MAX = -2**31, 2**31 - 1
+
+def optimize_dtypes(df, category_ratio: float = 0.5):
+    """
+    Convert a json_normalize'd DataFrame to compact dtypes in place and return it.
+
+    Timestamp-like string columns become datetime64, repetitive strings become categoricals
+    and integer columns are downcast to int32 when their values fit. int32 is the floor, not
+    int8/int16, so ordinary arithmetic on counts (current + previous, current - previous,
+    count * 2) doesn't silently wrap around.
+    """
+    import pandas as pd
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object:
+            name = str(column).lower()
+            if name in DATETIME_COLUMNS or 'date' in name or 'time' in name:
+                converted = pd.to_datetime(series, errors='coerce', utc=True, format='mixed')
+                # Only keep the conversion if every value parsed, e.g. aggregate keys are domains
+                if converted.notna().sum() == series.notna().sum():
+                    df[column] = converted
+                    continue
+            try:
+                unique = series.nunique(dropna=True)
+            except TypeError:  # Lists and dicts can't be categorical
+                continue
+            if len(series) > 1 and unique <= category_ratio * len(series):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            if len(series) and series.min() >= COUNT_MIN and series.max() <= COUNT_MAX:
+                df[column] = series.astype('int32')
+    return df
+
+def concat_frames(frames: List):
+    """Concatenate DataFrames, merging categoricals instead of falling back to object dtype"""
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    columns = list(dict.fromkeys(c for frame in frames for c in frame.columns))
+    data = {}
+    for column in columns:
+        parts = [frame[column] if column in frame else pd.Series([None] * len(frame), dtype=object) for frame in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            data[column] = union_categoricals([p.values for p in parts], ignore_order=True)
+        else:
+            data[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
 
 class Response:
     def __init__(self, data: Any):
@@ -25,12 +83,16 @@ class Response:
         return self.data
 
     def xml(self) -> str:
+        import xmltodict as xmltd
         try:
             return xmltd.unparse({'response': self.data})
         except ValueError as e:
             return str(e)
 
+    @timed('csv')
     def csv(self) -> Union[str, List[str]]:
+        # pandas is imported on first use so DoH-only code paths start quickly
+        import pandas as pd
         df2 = None
         if 'top_items' in self.data:
             df = pd.json_normalize(self.data['top_items'])
@@ -47,4 +109,45 @@ class Response:
         if df2 is not None:
             return [df.to_csv(), df2.to_csv()]
         else:
-            return df.to_csv()
\ No newline at end of file
+            return df.to_csv()
+
+    def _section(self, section: Optional[str] = None) -> Any:
+        if section is not None:
+            if section not in SECTIONS:
+                raise ValueError(f"section must be one of {SECTIONS}")
+            return self.data.get(section, [])
+        if isinstance(self.data, dict):
+            for name in SECTIONS:
+                if name in self.data:
+                    return self.data[name]
+        return self.data
+
+    @timed('to_dataframe')
+    def to_dataframe(self, section: Optional[str] = None, optimize: bool = True):
+        """
+        Convert the response to a pandas DataFrame with memory-efficient dtypes.
+
+        The section is picked like csv() does: top_items, logs, reports, then aggregates. For 
+        logs responses that also carry aggregates, the logs are returned; pass 
+        section='aggregates' for the other table.
+
+        :param section: (Optional) One of 'top_items', 'logs', 'reports' or 'aggregates'.
+        :param optimize: Use categoricals for repetitive strings, datetime64 for timestamps and 
+                         narrow integers for counts. The default is True.
+        :return: A DataFrame.
+        """
+        import pandas as pd
+        data = self._section(section)
+        df = pd.json_normalize(data if isinstance(data, (list, dict)) else [])
+        return optimize_dtypes(df) if optimize else df
+
+    @staticmethod
+    def concat_dataframes(pages: Iterable['Response'], section: Optional[str] = None):
+        """
+        Build one DataFrame from paged responses, one page at a time.
+
+        Each page is converted with optimized dtypes before the next is read, so the full set of
+        raw records never needs to be held at once. Categoricals are merged across pages.
+        """
+        frames = [page.to_dataframe(section) for page in pages]
+        return optimize_dtypes(concat_frames(frames))
\ No newline at end of file
@@ -0,0 +1,197 @@
+import base64, gzip, hashlib, json, threading, time
+from typing import Dict, Optional, Union
+from urllib.parse import urlencode
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(Exception):
+    """Raised when a replayed request has no recording in the cassette."""
+    pass
+
+
+def request_key(method: str, url: str, params: Optional[Dict] = None,
+                data: Optional[Union[str, bytes, Dict]] = None) -> str:
+    """A stable digest identifying a request. Headers (and so the API key) are not part of it."""
+    if isinstance(data, dict):
+        data = json.dumps(data, sort_keys=True)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', 'replace')
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    raw = '\n'.join((method.upper(), url, query, data or ''))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ReplayResponse:
+    """The subset of requests.Response that Connection and its callers use."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = 'utf-8'
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, 'replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: Optional[int] = 1):
+        # Like requests, a chunk_size of None yields the whole body at once
+        if chunk_size is None:
+            if self.content:
+                yield self.content
+            return
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            # Imported here so replaying on its own doesn't need requests
+            from requests import HTTPError
+            raise HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        pass
+
+
+class Cassette:
+    """
+    Recorded request/response pairs, stored as one gzip-compressed JSON document.
+
+    Entries are indexed by request_key. When a request was recorded several times the
+    responses are replayed in recorded order, wrapping around so a benchmark can loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = []
+        self.index = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        cassette = cls(path)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            document = json.load(f)
+        if document.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {document.get('version')}")
+        cassette.entries = document['entries']
+        for position, entry in enumerate(cassette.entries):
+            cassette.index.setdefault(entry['key'], []).append(position)
+        return cassette
+
+    def save(self):
+        with self._lock:
+            document = {'version': CASSETTE_VERSION, 'entries': self.entries}
+            with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+                json.dump(document, f, separators=(',', ':'))
+
+    def add(self, key: str, method: str, url: str, response, latency: float):
+        entry = {
+            'key': key,
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', ''),
+            'latency': round(latency, 6),
+        }
+        content = response.content
+        try:
+            entry['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_b64'] = base64.b64encode(content).decode('ascii')
+        with self._lock:
+            self.index.setdefault(key, []).append(len(self.entries))
+            self.entries.append(entry)
+
+    def next(self, key: str) -> dict:
+        with self._lock:
+            positions = self.index.get(key)
+            if not positions:
+                raise CassetteMissError(f"No recorded response for request {key} in {self.path}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return self.entries[positions[cursor % len(positions)]]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class RecordingTransport:
+    """
+    A session wrapper that performs real requests and records every response.
+
+    Pass it to Connection(transport=...) and call save() (or use it as a context manager)
+    when the workload is done. API keys are never written to the cassette.
+    """
+
+    def __init__(self, path: str, session=None):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.cassette = Cassette(path)
+
+    def request(self, method: str, url: str, data=None, headers=None, params=None, stream: bool = False, **kwargs):
+        started = time.perf_counter()
+        # Read the whole body so it can be recorded, streaming isn't meaningful here
+        response = self.session.request(method, url, data=data, headers=headers, params=params, **kwargs)
+        latency = time.perf_counter() - started
+        self.cassette.add(request_key(method, url, params, data), method, url, response, latency)
+        return response
+
+    def save(self):
+        self.cassette.save()
+
+    def __enter__(self) -> 'RecordingTransport':
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+
+class ReplayTransport:
+    """
+    A session stand-in that answers requests from a cassette, without network access.
+
+    :param path: The cassette file written by RecordingTransport.
+    :param latency: (Optional) Synthetic latency per request: None for none, a number of
+                    seconds, or 'recorded' to sleep for the latency observed while recording.
+    :param scale: A multiplier applied to the latency, e.g. 0.1 to replay 10x faster.
+    """
+
+    def __init__(self, path: str, latency: Optional[Union[float, str]] = None, scale: float = 1.0):
+        if latency is not None and latency != 'recorded' and not isinstance(latency, (int, float)):
+            raise ValueError("ReplayTransport: latency must be None, a number of seconds or 'recorded'")
+        self.cassette = Cassette.load(path)
+        self.latency = latency
+        self.scale = scale
+        self.requests = 0
+
+    def request(self, method: str, url: str, data=None, headers=None, params=None, stream: bool = False, **kwargs):
+        entry = self.cassette.next(request_key(method, url, params, data))
+        self.requests += 1
+
+        if self.latency == 'recorded':
+            delay = entry.get('latency', 0.0)
+        else:
+            delay = self.latency or 0.0
+        if delay:
+            time.sleep(delay * self.scale)
+
+        if 'body_b64' in entry:
+            content = base64.b64decode(entry['body_b64'])
+        else:
+            content = entry.get('body', '').encode('utf-8')
+        return ReplayResponse(entry['url'], entry['status'], {'Content-Type': entry.get('content_type', '')}, content)
+
+    def mount(self, *args):
+        pass
+
+    def close(self):
+        pass